@@ -9,6 +9,7 @@ RBAC权限系统测试配置文件
 """
 
 import os
+from functools import lru_cache
 from typing import Dict, List, Any
 
 
@@ -18,10 +19,17 @@ class TestConfig:
     # 系统配置
     SIMULATION_MODE = os.getenv('RBAC_SIMULATION', 'false').lower() == 'true'
 
+    # 经本机ProxySQL连接（RBAC_VIA_PROXYSQL=true）：压力测试的大量应用连接由ProxySQL
+    # 复用到少量MySQL后端连接上，默认端口改为ProxySQL的6033。proxysql.cnf 参考：
+    #   mysql_variables = { threads=4  max_connections=2048 }
+    #   mysql_query_rules = ( { rule_id=1 active=1 match_digest="." destination_hostgroup=0 apply=1 } )
+    VIA_PROXYSQL = os.getenv('RBAC_VIA_PROXYSQL', 'false').lower() == 'true'
+    PROXYSQL_PORT = 6033
+
     # 数据库配置
     DATABASE = {
         'host': os.getenv('DB_HOST', 'localhost'),
-        'port': int(os.getenv('DB_PORT', 3306)),
+        'port': int(os.getenv('DB_PORT', PROXYSQL_PORT if VIA_PROXYSQL else 3306)),
         'user': os.getenv('DB_USER', 'root'),
         'password': os.getenv('DB_PASSWORD', ''),
         'database': os.getenv('DB_NAME', 'rbac_system'),
@@ -36,6 +44,13 @@ class TestConfig:
         'idle_timeout': 3600
     }
     
+    # 批量加载配置
+    BULK_LOAD = {
+        'local_infile': True,           # 允许 LOAD DATA LOCAL INFILE
+        'load_data_threshold': 10000,   # 生成数量达到该值时用 LOAD DATA 代替 INSERT
+        'server_side_generation': True  # 用户和权限数据由 INSERT ... SELECT 在服务端生成（MySQL 8+）
+    }
+    
     # 数据生成配置
     DATA_GENERATION = {
         'users': {
@@ -92,6 +107,8 @@ class TestConfig:
     PERFORMANCE_TEST = {
         'authentication': {
             'single_login_tests': 100,
+            'password_verify_tests': 200,
+            'password_hash_rounds': 10,
             'concurrent_tests': [100, 500, 1000],
             'timeout': 30,
             'expected_response_time': 0.5  # 500ms
@@ -105,6 +122,7 @@ class TestConfig:
         },
         'data_operations': {
             'crud_test_count': 500,
+            'crud_transaction_size': 50,  # 每个事务包含的CRUD轮数
             'batch_sizes': [10, 50, 100, 500, 1000],
             'concurrent_operations': [10, 50, 100],
             'timeout': 60
@@ -267,9 +285,17 @@ default_config = TestConfig()
 
 # 便捷函数
 def get_config(env: str = None) -> TestConfig:
-    """获取配置实例"""
+    """获取配置实例（同一环境的配置实例在进程内复用）"""
+    if env is None:
+        env = os.getenv('RBAC_ENV', 'development')
+    return _get_env_config(env)
+
+@lru_cache(maxsize=None)
+def _get_env_config(env: str) -> TestConfig:
+    """按环境名缓存配置实例"""
     return EnvironmentConfig.get_config(env)
 
+@lru_cache(maxsize=None)
 def get_scenario(name: str) -> Dict[str, Any]:
     """获取测试场景配置"""
     return TEST_SCENARIOS.get(name, TEST_SCENARIOS['standard_test'])
@@ -11,7 +11,7 @@ Created: 2025-07-19
 """
 
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterable
 from abc import ABC, abstractmethod
 
 from sqlalchemy import Column, Integer, DateTime, create_engine
@@ -85,12 +85,12 @@ class BaseModel(Base, ABC, metaclass=BaseModelMeta):
         if not hasattr(self, 'updated_at') or self.updated_at is None:
             self.updated_at = now
     
-    def to_dict(self, exclude_fields: Optional[list] = None) -> Dict[str, Any]:
+    def to_dict(self, exclude_fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
         转换为字典格式
         
         Args:
-            exclude_fields (list, optional): 要排除的字段列表
+            exclude_fields (Iterable[str], optional): 要排除的字段（列表或集合）
             
         Returns:
             Dict[str, Any]: 字典格式的数据
@@ -99,13 +99,13 @@ class BaseModel(Base, ABC, metaclass=BaseModelMeta):
             >>> user = User(username="admin", email="admin@example.com")
             >>> user_dict = user.to_dict(exclude_fields=['password_hash'])
         """
-        exclude_fields = exclude_fields or []
+        excluded = set(exclude_fields) if exclude_fields else set()
         result = {}
         
         # 获取所有列
         for column in self.__table__.columns:
             field_name = column.name
-            if field_name not in exclude_fields:
+            if field_name not in excluded:
                 value = getattr(self, field_name)
                 # 处理datetime类型
                 if isinstance(value, datetime):
@@ -362,13 +362,11 @@ class Permission(BaseModel):
         Returns:
             Dict[str, Any]: 字典格式的数据
         """
-        # 权限表没有updated_at字段
-        if exclude_fields is None:
-            exclude_fields = ['updated_at']
-        elif 'updated_at' not in exclude_fields:
-            exclude_fields.append('updated_at')
+        # 权限表没有updated_at字段（复制一份，不修改调用方传入的列表）
+        excluded = set(exclude_fields) if exclude_fields else set()
+        excluded.add('updated_at')
         
-        return super().to_dict(exclude_fields=exclude_fields)
+        return super().to_dict(exclude_fields=excluded)
     
     def to_detail_dict(self) -> Dict[str, Any]:
         """
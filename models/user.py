@@ -13,13 +13,19 @@ Created: 2025-07-19
 
 import re
 from datetime import datetime
+from functools import cached_property
 from typing import Optional, List, Dict, Any
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, event
+from sqlalchemy.orm import relationship, selectinload
 
 from .base_model import BaseModel
 
+# 用户名格式：字母开头，只包含字母、数字、下划线
+USERNAME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9_]*$')
+# 邮箱格式（各段限定长度，配合fullmatch使用，避免病态输入下的回溯）
+EMAIL_RE = re.compile(r'[A-Za-z0-9._%+\-]{1,64}@[A-Za-z0-9.\-]{1,253}\.[A-Za-z]{2,24}')
+
 
 class User(BaseModel):
     """
@@ -84,8 +90,12 @@ class User(BaseModel):
         Index('idx_username', 'username'),
         Index('idx_email', 'email'),
         Index('idx_status_created', 'status', 'created_at'),
+        Index('idx_users_status_id', 'status', 'id'),
     )
     
+    # 公开字典包含的基础字段（to_public_dict使用）
+    _PUBLIC_FIELDS = ('id', 'username', 'email', 'status')
+    
     # 关系映射
     # 用户的角色关联（一对多）
     user_roles = relationship(
@@ -118,7 +128,34 @@ class User(BaseModel):
         """
         super().__init__(**kwargs)
     
-    def validate_username(self, username: str) -> bool:
+    @classmethod
+    def with_permissions(cls, session, user_id: int) -> Optional['User']:
+        """
+        加载用户并预取其角色与权限
+        
+        通过selectinload一次性批量加载 user_roles -> role -> role_permissions
+        -> permission 关联链，避免has_permission等方法逐个角色触发懒加载查询。
+        
+        Args:
+            session: 数据库会话
+            user_id (int): 用户ID
+            
+        Returns:
+            Optional[User]: 找到的用户对象，如果不存在则返回None
+        """
+        from .user_role import UserRole
+        from .role import Role
+        from .role_permission import RolePermission
+        
+        return session.query(cls).options(
+            selectinload(cls.user_roles)
+            .selectinload(UserRole.role)
+            .selectinload(Role.role_permissions)
+            .selectinload(RolePermission.permission)
+        ).filter(cls.id == user_id).first()
+    
+    @staticmethod
+    def validate_username(username: str) -> bool:
         """
         验证用户名格式
         
@@ -134,24 +171,23 @@ class User(BaseModel):
             bool: 验证是否通过
             
         Example:
-            >>> user = User()
-            >>> user.validate_username("admin123")
+            >>> User.validate_username("admin123")
             True
-            >>> user.validate_username("123admin")
+            >>> User.validate_username("123admin")
             False
         """
         if not username or not isinstance(username, str):
             return False
         
-        # 长度检查
-        if len(username) < 3 or len(username) > 32:
+        # 长度检查，非ASCII输入直接拒绝（无需进入正则匹配）
+        if not (3 <= len(username) <= 32) or not username.isascii():
             return False
         
         # 格式检查：字母开头，只包含字母、数字、下划线
-        pattern = r'^[a-zA-Z][a-zA-Z0-9_]*$'
-        return re.match(pattern, username) is not None
+        return USERNAME_RE.match(username) is not None
     
-    def validate_email(self, email: str) -> bool:
+    @staticmethod
+    def validate_email(email: str) -> bool:
         """
         验证邮箱格式
         
@@ -162,22 +198,20 @@ class User(BaseModel):
             bool: 验证是否通过
             
         Example:
-            >>> user = User()
-            >>> user.validate_email("admin@example.com")
+            >>> User.validate_email("admin@example.com")
             True
-            >>> user.validate_email("invalid-email")
+            >>> User.validate_email("invalid-email")
             False
         """
         if not email or not isinstance(email, str):
             return False
         
-        # 长度检查
-        if len(email) > 64:
+        # 长度检查，不含@或含非ASCII字符的输入直接拒绝
+        if len(email) > 64 or not email.isascii() or '@' not in email:
             return False
         
         # 邮箱格式检查
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return EMAIL_RE.fullmatch(email) is not None
     
     def is_active(self) -> bool:
         """
@@ -214,6 +248,24 @@ class User(BaseModel):
         self.password_hash = password_hash
         self.update_timestamp()
     
+    @cached_property
+    def active_roles(self) -> tuple:
+        """
+        用户当前启用的角色（按实例缓存）
+        
+        同一请求内多次调用get_roles/has_role/has_permission时只筛选一次。
+        缓存依赖user_roles集合及各关联的status/role，这些变更以及对象
+        过期/刷新时由模块末尾的属性事件调用_invalidate_roles清除。
+        
+        Returns:
+            tuple: 启用关联对应的角色元组
+        """
+        return tuple(ur.role for ur in self.user_roles if ur.status == 1 and ur.role is not None)
+    
+    def _invalidate_roles(self):
+        """清除active_roles缓存"""
+        self.__dict__.pop('active_roles', None)
+    
     def get_roles(self) -> List['Role']:
         """
         获取用户的所有角色
@@ -221,7 +273,7 @@ class User(BaseModel):
         Returns:
             List[Role]: 用户拥有的角色列表
         """
-        return [ur.role for ur in self.user_roles if ur.status == 1]
+        return list(self.active_roles)
     
     def has_role(self, role_code: str) -> bool:
         """
@@ -233,8 +285,7 @@ class User(BaseModel):
         Returns:
             bool: 如果用户具有该角色返回True，否则返回False
         """
-        roles = self.get_roles()
-        return any(role.role_code == role_code for role in roles)
+        return any(role.role_code == role_code for role in self.active_roles)
     
     def get_permissions(self) -> List['Permission']:
         """
@@ -244,9 +295,8 @@ class User(BaseModel):
             List[Permission]: 用户拥有的权限列表
         """
         permissions = []
-        roles = self.get_roles()
         
-        for role in roles:
+        for role in self.active_roles:
             role_permissions = role.get_permissions()
             permissions.extend(role_permissions)
         
@@ -270,8 +320,7 @@ class User(BaseModel):
         Returns:
             bool: 如果用户具有该权限返回True，否则返回False
         """
-        permissions = self.get_permissions()
-        return any(permission.permission_code == permission_code for permission in permissions)
+        return any(role.has_permission(permission_code) for role in self.active_roles)
     
     def validate(self) -> bool:
         """
@@ -287,11 +336,11 @@ class User(BaseModel):
         super().validate()
         
         # 用户名验证
-        if not self.validate_username(self.username):
+        if not type(self).validate_username(self.username):
             raise ValueError("用户名格式不正确：长度3-32字符，字母开头，只能包含字母、数字、下划线")
         
         # 邮箱验证
-        if not self.validate_email(self.email):
+        if not type(self).validate_email(self.email):
             raise ValueError("邮箱格式不正确")
         
         # 密码哈希验证
@@ -314,13 +363,11 @@ class User(BaseModel):
         Returns:
             Dict[str, Any]: 字典格式的数据
         """
-        # 默认排除敏感字段
-        if exclude_fields is None:
-            exclude_fields = ['password_hash']
-        elif 'password_hash' not in exclude_fields:
-            exclude_fields.append('password_hash')
+        # 默认排除敏感字段（复制一份，不修改调用方传入的列表）
+        excluded = set(exclude_fields) if exclude_fields else set()
+        excluded.add('password_hash')
         
-        return super().to_dict(exclude_fields=exclude_fields)
+        return super().to_dict(exclude_fields=excluded)
     
     def to_public_dict(self) -> Dict[str, Any]:
         """
@@ -329,15 +376,12 @@ class User(BaseModel):
         Returns:
             Dict[str, Any]: 公开的字典格式数据
         """
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'status': self.status,
-            'is_active': self.is_active(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        result = {field_name: getattr(self, field_name) for field_name in self._PUBLIC_FIELDS}
+        result['is_active'] = self.status == 1
+        created_at, updated_at = self.created_at, self.updated_at
+        result['created_at'] = created_at.isoformat() if created_at else None
+        result['updated_at'] = updated_at.isoformat() if updated_at else None
+        return result
     
     def __str__(self) -> str:
         """
@@ -346,7 +390,8 @@ class User(BaseModel):
         Returns:
             str: 对象的字符串表示
         """
-        return f"User(id={self.id}, username='{self.username}', email='{self.email}', status={self.status})"
+        return "User(id=%s, username='%s', email='%s', status=%s)" % (
+            self.id, self.username, self.email, self.status)
     
     def __repr__(self) -> str:
         """
@@ -356,3 +401,20 @@ class User(BaseModel):
             str: 对象的开发者表示
         """
         return self.__str__()
+
+
+# active_roles缓存失效：user_roles集合增删、对象过期或刷新时清除
+@event.listens_for(User.user_roles, 'append')
+@event.listens_for(User.user_roles, 'remove')
+def _on_user_roles_change(target, value, initiator):
+    target._invalidate_roles()
+
+
+@event.listens_for(User, 'expire')
+def _on_user_expire(target, attrs):
+    target._invalidate_roles()
+
+
+@event.listens_for(User, 'refresh')
+def _on_user_refresh(target, context, attrs):
+    target._invalidate_roles()
@@ -12,12 +12,15 @@ Created: 2025-07-19
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from functools import cached_property
+from typing import Optional, List, Dict, Any
 
-from sqlalchemy import Column, Integer, SmallInteger, DateTime, ForeignKey, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, SmallInteger, DateTime, ForeignKey, Index, event
+from sqlalchemy.orm import relationship, object_session
+from sqlalchemy.orm.util import identity_key
 
 from .base_model import BaseModel
+from .user import User
 
 
 class UserRole(BaseModel):
@@ -89,12 +92,22 @@ class UserRole(BaseModel):
     
     # 索引定义
     __table_args__ = (
-        Index('idx_user_role_user_id', 'user_id'),
-        Index('idx_user_role_role_id', 'role_id'),
+        Index('idx_ur_user_status', 'user_id', 'status'),
+        Index('idx_ur_role_status', 'role_id', 'status'),
         Index('idx_user_role_assigned_by', 'assigned_by'),
         Index('idx_user_role_status_assigned', 'status', 'assigned_at'),
     )
     
+    # 构造方法允许设置的字段（含关系属性）
+    _ALLOWED_KWARGS = frozenset({
+        'user_id', 'role_id', 'assigned_at', 'assigned_by', 'status', 'created_at', 'updated_at',
+        'user', 'role', 'assigner'
+    })
+    
+    # to_dict序列化字段：整数字段与时间字段
+    _SCALAR_FIELDS = ('user_id', 'role_id', 'assigned_by', 'status')
+    _DATETIME_FIELDS = ('assigned_at', 'created_at', 'updated_at')
+    
     # 关系映射
     user = relationship(
         "User", 
@@ -119,21 +132,40 @@ class UserRole(BaseModel):
         Args:
             **kwargs: 字段值的关键字参数
         """
-        # 设置分配时间
-        if 'assigned_at' not in kwargs:
-            kwargs['assigned_at'] = datetime.utcnow()
+        # 设置分配时间和时间戳，同一实例只取一次当前时间（已全部提供时不取）
+        if ('assigned_at' not in kwargs or kwargs.get('created_at') is None
+                or kwargs.get('updated_at') is None):
+            now = datetime.utcnow()
+            kwargs.setdefault('assigned_at', now)
+            if kwargs.get('created_at') is None:
+                kwargs['created_at'] = now
+            if kwargs.get('updated_at') is None:
+                kwargs['updated_at'] = now
         
         # 调用父类构造方法，但跳过id相关处理
         for key, value in kwargs.items():
-            if hasattr(self, key):
+            if key in self._ALLOWED_KWARGS:
                 setattr(self, key, value)
+    
+    @classmethod
+    def bulk_create(cls, session, rows: List[Dict[str, Any]]) -> List['UserRole']:
+        """
+        批量构造用户角色关联并加入会话
         
-        # 设置时间戳（不包括id字段）
+        整批共用同一个时间戳，未提供的分配时间、创建时间和更新时间均取该值。
+        
+        Args:
+            session: 数据库会话
+            rows (List[Dict[str, Any]]): 关联字段字典列表
+            
+        Returns:
+            List[UserRole]: 创建的关联对象列表（未flush）
+        """
         now = datetime.utcnow()
-        if not hasattr(self, 'created_at') or self.created_at is None:
-            self.created_at = now
-        if not hasattr(self, 'updated_at') or self.updated_at is None:
-            self.updated_at = now
+        defaults = {'assigned_at': now, 'created_at': now, 'updated_at': now}
+        user_roles = [cls(**{**defaults, **row}) for row in rows]
+        session.add_all(user_roles)
+        return user_roles
     
     def is_active(self) -> bool:
         """
@@ -154,9 +186,10 @@ class UserRole(BaseModel):
         self.status = 0
         self.update_timestamp()
     
-    def get_user_info(self) -> Dict[str, Any]:
+    @cached_property
+    def user_info(self) -> Dict[str, Any]:
         """
-        获取关联用户的基本信息
+        关联用户的基本信息（按实例缓存）
         
         Returns:
             Dict[str, Any]: 用户基本信息
@@ -170,9 +203,10 @@ class UserRole(BaseModel):
             }
         return {}
     
-    def get_role_info(self) -> Dict[str, Any]:
+    @cached_property
+    def role_info(self) -> Dict[str, Any]:
         """
-        获取关联角色的基本信息
+        关联角色的基本信息（按实例缓存）
         
         Returns:
             Dict[str, Any]: 角色基本信息
@@ -186,9 +220,10 @@ class UserRole(BaseModel):
             }
         return {}
     
-    def get_assigner_info(self) -> Dict[str, Any]:
+    @cached_property
+    def assigner_info(self) -> Dict[str, Any]:
         """
-        获取分配人的基本信息
+        分配人的基本信息（按实例缓存）
         
         Returns:
             Dict[str, Any]: 分配人基本信息
@@ -201,6 +236,33 @@ class UserRole(BaseModel):
             }
         return {}
     
+    def get_user_info(self) -> Dict[str, Any]:
+        """
+        获取关联用户的基本信息
+        
+        Returns:
+            Dict[str, Any]: 用户基本信息
+        """
+        return self.user_info
+    
+    def get_role_info(self) -> Dict[str, Any]:
+        """
+        获取关联角色的基本信息
+        
+        Returns:
+            Dict[str, Any]: 角色基本信息
+        """
+        return self.role_info
+    
+    def get_assigner_info(self) -> Dict[str, Any]:
+        """
+        获取分配人的基本信息
+        
+        Returns:
+            Dict[str, Any]: 分配人基本信息
+        """
+        return self.assigner_info
+    
     def is_assigned_by_user(self, user_id: int) -> bool:
         """
         检查是否由特定用户分配
@@ -213,18 +275,38 @@ class UserRole(BaseModel):
         """
         return self.assigned_by == user_id
     
-    def get_assignment_duration(self) -> Optional[int]:
+    def get_assignment_duration(self, now: Optional[datetime] = None) -> Optional[int]:
         """
         获取分配持续时间（天数）
         
+        Args:
+            now (datetime, optional): 计算基准时间，默认为当前UTC时间
+            
         Returns:
             Optional[int]: 分配持续天数，如果无法计算返回None
         """
         if self.assigned_at:
-            duration = datetime.utcnow() - self.assigned_at
+            duration = (now or datetime.utcnow()) - self.assigned_at
             return duration.days
         return None
     
+    @classmethod
+    def compute_durations(cls, rows: List['UserRole'], now: Optional[datetime] = None) -> List[Optional[int]]:
+        """
+        批量计算分配持续时间（天数）
+        
+        整个列表共用同一个基准时间，适用于列表页序列化。
+        
+        Args:
+            rows (List[UserRole]): 用户角色关联列表
+            now (datetime, optional): 计算基准时间，默认为当前UTC时间
+            
+        Returns:
+            List[Optional[int]]: 与rows一一对应的分配持续天数
+        """
+        now = now or datetime.utcnow()
+        return [(now - row.assigned_at).days if row.assigned_at else None for row in rows]
+    
     def validate(self) -> bool:
         """
         数据验证
@@ -236,10 +318,10 @@ class UserRole(BaseModel):
             ValueError: 当数据验证失败时
         """
         # 基础字段验证
-        if not hasattr(self, 'created_at') or self.created_at is None:
+        if self.created_at is None:
             raise ValueError("创建时间不能为空")
         
-        if not hasattr(self, 'updated_at') or self.updated_at is None:
+        if self.updated_at is None:
             raise ValueError("更新时间不能为空")
         
         # 用户ID验证
@@ -278,37 +360,38 @@ class UserRole(BaseModel):
         Returns:
             Dict[str, Any]: 字典格式的数据
         """
-        exclude_fields = exclude_fields or []
-        result = {}
-        
-        # 手动添加字段（因为没有单一主键id）
-        fields = ['user_id', 'role_id', 'assigned_at', 'assigned_by', 'status', 'created_at', 'updated_at']
+        excluded = set(exclude_fields or ())
         
-        for field_name in fields:
-            if field_name not in exclude_fields and hasattr(self, field_name):
+        # 手动添加字段（因为没有单一主键id），字段类型在定义时已确定
+        result = {
+            field_name: getattr(self, field_name)
+            for field_name in self._SCALAR_FIELDS if field_name not in excluded
+        }
+        for field_name in self._DATETIME_FIELDS:
+            if field_name not in excluded:
                 value = getattr(self, field_name)
-                # 处理datetime类型
-                if isinstance(value, datetime):
-                    result[field_name] = value.isoformat()
-                else:
-                    result[field_name] = value
+                result[field_name] = value.isoformat() if value else None
         
         return result
     
-    def to_detail_dict(self) -> Dict[str, Any]:
+    def to_detail_dict(self, now: Optional[datetime] = None) -> Dict[str, Any]:
         """
         转换为详细的字典格式（包含关联对象信息）
         
+        Args:
+            now (datetime, optional): 计算分配持续时间的基准时间，
+                批量序列化时传入同一值可避免逐条获取当前时间
+            
         Returns:
             Dict[str, Any]: 详细的字典格式数据
         """
         base_dict = self.to_dict()
         base_dict.update({
             'is_active': self.is_active(),
-            'assignment_duration_days': self.get_assignment_duration(),
-            'user_info': self.get_user_info(),
-            'role_info': self.get_role_info(),
-            'assigner_info': self.get_assigner_info()
+            'assignment_duration_days': self.get_assignment_duration(now),
+            'user_info': self.user_info,
+            'role_info': self.role_info,
+            'assigner_info': self.assigner_info
         })
         return base_dict
     
@@ -342,10 +425,12 @@ class UserRole(BaseModel):
         """
         哈希值计算
         
+        每次按当前主键计算，不缓存：flush前修改user_id/role_id后哈希值随之变化。
+        
         Returns:
             int: 对象的哈希值
         """
-        return hash((self.__class__.__name__, self.user_id, self.role_id))
+        return hash((self.user_id, self.role_id))
     
     def __str__(self) -> str:
         """
@@ -354,15 +439,47 @@ class UserRole(BaseModel):
         Returns:
             str: 对象的字符串表示
         """
-        return (f"UserRole(user_id={self.user_id}, role_id={self.role_id}, "
-                f"assigned_at='{self.assigned_at}', assigned_by={self.assigned_by}, "
-                f"status={self.status})")
+        return "UserRole(user_id=%s, role_id=%s, assigned_at='%s', assigned_by=%s, status=%s)" % (
+            self.user_id, self.role_id, self.assigned_at, self.assigned_by, self.status)
     
     def __repr__(self) -> str:
         """
         开发者表示
         
+        仅包含主键和状态，供日志与断言输出使用；完整字段见__str__或to_dict。
+        
         Returns:
             str: 对象的开发者表示
         """
-        return self.__str__()
+        return "UserRole(user_id=%s, role_id=%s, status=%s)" % (
+            self.user_id, self.role_id, self.status)
+
+
+
+def _invalidate_user_roles(user_role: UserRole, *user_ids: Optional[int]):
+    """
+    清除关联所属用户的active_roles缓存
+
+    已加载的user关系直接清除；user_ids对应的用户从会话标识映射中查找，不触发懒加载。
+    """
+    users = [user_role.__dict__.get('user')]
+    session = object_session(user_role)
+    if session is not None:
+        users.extend(session.identity_map.get(identity_key(User, user_id))
+                     for user_id in user_ids if isinstance(user_id, int))
+    for user in users:
+        if user is not None:
+            user._invalidate_roles()
+
+
+# 关联启用/禁用或改指向其他角色、其他用户时，相关用户的active_roles随之失效
+@event.listens_for(UserRole.status, 'set')
+@event.listens_for(UserRole.role_id, 'set')
+@event.listens_for(UserRole.role, 'set')
+def _on_user_role_change(target, value, oldvalue, initiator):
+    _invalidate_user_roles(target, target.__dict__.get('user_id'))
+
+
+@event.listens_for(UserRole.user_id, 'set')
+def _on_user_role_user_change(target, value, oldvalue, initiator):
+    _invalidate_user_roles(target, oldvalue, value)
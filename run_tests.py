@@ -18,6 +18,7 @@ Options:
     --coverage: 生成覆盖率报告
     --html: 生成HTML报告
     --markers: 指定测试标记（如 unit, integration, slow）
+    --bootstrap: 执行前安装测试依赖（别名 --install-deps）
 
 Author: AI Assistant
 Created: 2025-07-19
@@ -57,13 +58,16 @@ def install_dependencies():
     
     print("安装测试依赖...")
     for dep in dependencies:
-        try:
-            subprocess.run([sys.executable, '-m', 'pip', 'install', dep], 
-                         check=True, capture_output=True)
-            print(f"✓ 已安装: {dep}")
-        except subprocess.CalledProcessError as e:
-            print(f"✗ 安装失败: {dep} - {e}")
-            return False
+        print(f"  - {dep}")
+    
+    # 一次pip调用安装全部依赖，由解析器统一处理
+    try:
+        subprocess.run([sys.executable, '-m', 'pip', 'install', *dependencies],
+                       check=True, capture_output=True)
+        print(f"✓ 已安装 {len(dependencies)} 个依赖")
+    except subprocess.CalledProcessError as e:
+        print(f"✗ 安装失败: {e}")
+        return False
     
     return True
 
@@ -111,9 +115,23 @@ def run_tests(args):
     cmd.extend([
         '--tb=short',  # 简短的错误回溯
         '--strict-markers',  # 严格标记模式
-        '--disable-warnings'  # 禁用警告
+        '--disable-warnings',  # 禁用警告
+        '--import-mode=importlib'  # 按importlib导入测试模块，不修改sys.path
     ])
     
+    # 关闭插件自动发现（避免启动时扫描全部entry_points），显式加载用到的插件
+    plugins = []
+    if not args.verbose:
+        plugins.append('xdist.plugin')
+    if args.coverage:
+        plugins.append('pytest_cov.plugin')
+    if args.html:
+        plugins.append('pytest_html.plugin')
+    for plugin in plugins:
+        cmd.extend(['-p', plugin])
+    
+    env = dict(os.environ, PYTEST_DISABLE_PLUGIN_AUTOLOAD='1')
+    
     print(f"执行命令: {' '.join(cmd)}")
     print("=" * 80)
     
@@ -122,7 +140,7 @@ def run_tests(args):
     
     # 执行测试
     try:
-        result = subprocess.run(cmd, check=False)
+        result = subprocess.run(cmd, check=False, env=env)
         return result.returncode == 0
     except Exception as e:
         print(f"测试执行失败: {e}")
@@ -239,7 +257,8 @@ def main():
     parser.add_argument('--coverage', action='store_true', help='生成覆盖率报告')
     parser.add_argument('--html', action='store_true', help='生成HTML报告')
     parser.add_argument('--markers', type=str, help='指定测试标记')
-    parser.add_argument('--install-deps', action='store_true', help='安装测试依赖')
+    parser.add_argument('--bootstrap', '--install-deps', dest='bootstrap', action='store_true',
+                        help='执行前安装测试依赖')
     
     args = parser.parse_args()
     
@@ -250,7 +269,7 @@ def main():
     setup_environment()
     
     # 安装依赖
-    if args.install_deps:
+    if args.bootstrap:
         if not install_dependencies():
             print("❌ 依赖安装失败")
             return 1
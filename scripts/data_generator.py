@@ -11,29 +11,337 @@ RBAC权限系统测试数据生成器
 import sys
 import os
 import random
+import tempfile
 import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Tuple
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Sequence
+import gc
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+import queue
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 import threading
+from array import array
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
     from faker import Faker
+    from faker.providers import BaseProvider
     from tqdm import tqdm
+    import numpy as np
     import pymysql
 except ImportError as e:
     print(f"缺少依赖包: {e}")
-    print("请运行: pip install faker tqdm pymysql")
+    print("请运行: pip install faker tqdm numpy pymysql")
     sys.exit(1)
 
 from utils.password_utils import hash_password
 from utils.db_utils import DatabaseManager, DatabaseConfig
 from config.test_config import get_config, get_scenario
 
+# 各表插入列（多值INSERT按此顺序展开参数）
+USER_COLUMNS = ('username', 'email', 'password_hash', 'status')
+ROLE_COLUMNS = ('role_name', 'role_code', 'status')
+PERMISSION_COLUMNS = ('permission_name', 'permission_code', 'resource_type', 'action_type')
+USER_ROLE_COLUMNS = ('user_id', 'role_id', 'assigned_by', 'status')
+ROLE_PERMISSION_COLUMNS = ('role_id', 'permission_id', 'granted_by', 'status')
+AUDIT_LOG_COLUMNS = (
+    'user_id', 'action_type', 'resource_type', 'resource_id', 'action_result',
+    'ip_address', 'user_agent', 'request_data', 'response_data', 'error_message', 'created_at'
+)
+
+# 单条多值INSERT语句的最大行数，避免超过max_allowed_packet
+MULTI_VALUES_CHUNK_SIZE = 1000
+
+# 写入队列容量：生成端最多领先写线程的批次数，限制内存占用
+WRITE_QUEUE_SIZE = 4
+
+# 批量加载会话参数，须在事务开始前逐条设置（sql_log_bin不允许在事务内修改）；
+# 缺少权限（如sql_log_bin需要SUPER）时跳过该项
+BULK_SESSION_SETTINGS = (
+    # MyISAM批量插入缓冲，对InnoDB无副作用
+    "SET SESSION bulk_insert_buffer_size = 268435456",
+    # 测试数据无需复制，不写binlog
+    "SET SESSION sql_log_bin = 0",
+)
+
+# 预生成取值池大小（逐行调用Faker开销很大，改为从池中随机取值）
+USER_AGENT_POOL_SIZE = 256
+SENTENCE_POOL_SIZE = 256
+EMAIL_DOMAIN_POOL_SIZE = 64
+IP_POOL_SIZE = 4096
+COMPANY_POOL_SIZE = 1024
+
+# 服务端生成：递归CTE产生0..N-1序列，数据直接在MySQL中构造，无需经过Python和网络
+SEQUENCE_CTE = (
+    "WITH RECURSIVE seq (n, r1, r2) AS ("
+    "SELECT 0, RAND(), RAND() "
+    "UNION ALL SELECT n + 1, RAND(), RAND() FROM seq WHERE n < %s) "
+)
+USERS_INSERT_SELECT_SQL = (
+    f"INSERT INTO users ({', '.join(USER_COLUMNS)}) "
+    + SEQUENCE_CTE +
+    "SELECT CONCAT('u_', n), CONCAT('u_', n, '@test.local'), %s, IF(r1 < %s, 1, 0) FROM seq"
+)
+
+
+# 操作日志响应内容只有成功/失败两种，预先生成
+SUCCESS_RESPONSE_DATA = '{"status": "success", "code": 200}'
+FAILED_RESPONSE_DATA = '{"status": "failed", "code": 400}'
+
+
+def _ids_to_ndarray(ids: Sequence[int]) -> np.ndarray:
+    """将_fetch_ids返回的ID序列转换为int64数组（range用arange生成，array直接复用缓冲区）"""
+    if isinstance(ids, range):
+        return np.arange(ids.start, ids.stop, dtype=np.int64)
+    return np.asarray(ids, dtype=np.int64)
+
+
+def _sample_distinct_per_row(pool: np.ndarray, counts: np.ndarray,
+                             block_elems: int = 1 << 22) -> np.ndarray:
+    """
+    为每一行从pool中无放回抽取counts[i]个元素，结果按行顺序拼接
+
+    每行对随机键argsort得到一个随机排列，取前counts[i]个；按块处理，
+    单块随机矩阵约block_elems个元素，避免用户数×角色数的整矩阵占满内存。
+
+    Args:
+        pool: 候选元素数组
+        counts: 每行抽取个数（不超过len(pool)）
+        block_elems: 单块随机矩阵的元素数上限
+
+    Returns:
+        np.ndarray: 长度为counts.sum()的抽样结果
+    """
+    width = int(counts.max(initial=0))
+    if width == 0:
+        return pool[:0]
+    rows_per_block = max(1, block_elems // len(pool))
+    parts = []
+    for start in range(0, len(counts), rows_per_block):
+        block_counts = counts[start:start + rows_per_block]
+        order = np.argsort(np.random.random((len(block_counts), len(pool))), axis=1)[:, :width]
+        mask = np.arange(width) < block_counts[:, None]
+        parts.append(pool[order[mask]])
+    return np.concatenate(parts)
+
+
+@lru_cache(maxsize=None)
+def _cached_password_hash(password: str) -> str:
+    """
+    获取默认密码的哈希值（每个进程每个密码只计算一次）
+    
+    bcrypt单次计算耗时数百毫秒，生成器多次调用generate_users时复用同一结果。
+    """
+    return hash_password(password)
+
+
+def _permissions_insert_select_sql(module_count: int, action_count: int) -> str:
+    """构造权限服务端生成SQL，模块和动作按CTE中的随机数从ELT参数列表中选取"""
+    module_args = ', '.join(['%s'] * module_count)
+    action_args = ', '.join(['%s'] * action_count)
+    module_expr = f"ELT(1 + FLOOR(r1 * {module_count}), {module_args})"
+    action_expr = f"ELT(1 + FLOOR(r2 * {action_count}), {action_args})"
+    return (
+        f"INSERT INTO permissions ({', '.join(PERMISSION_COLUMNS)}) "
+        + SEQUENCE_CTE +
+        "SELECT CONCAT(m, ' ', a, ' res', n), CONCAT(m, ':', a, ':res_', n), m, a "
+        f"FROM (SELECT n, {module_expr} AS m, {action_expr} AS a FROM seq) t"
+    )
+
+
+def _fast_random_element(self, elements=('a', 'b', 'c')):
+    """
+    BaseProvider.random_element的快速版本
+    
+    list/tuple/str直接用generator.random.choice取值，跳过random_elements中的
+    参数检查和choices_distribution调用；带权重的OrderedDict等其他类型仍走原实现。
+    """
+    if isinstance(elements, (tuple, list, str)):
+        return self.generator.random.choice(elements)
+    return _original_random_element(self, elements)
+
+
+_original_random_element = BaseProvider.random_element
+
+
+def _to_tsv_field(value: Any) -> str:
+    """将字段值转换为LOAD DATA可识别的TSV文本（NULL写作\\N）"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    text = str(value)
+    if '\\' in text or '\t' in text or '\n' in text:
+        text = text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+    return text
+
+
+# ---------------------------------------------------------------------------
+# 子进程批次构建函数
+#
+# 数据构建是CPU密集型操作，受GIL限制无法用线程加速。以下函数定义在模块顶层，
+# 以便ProcessPoolExecutor序列化调用；每个批次使用独立种子，批次之间互不依赖。
+# ---------------------------------------------------------------------------
+
+_worker_fake = None
+_worker_pools: Dict[str, List[str]] = {}
+
+
+def _init_worker(locale: str, pools: Dict[str, List[str]]):
+    """子进程初始化：创建进程内的Faker实例并接收预生成取值池"""
+    global _worker_fake, _worker_pools
+    # 批次数据只含元组和字符串，不存在循环引用，子进程内关闭循环GC
+    gc.disable()
+    BaseProvider.random_element = _fast_random_element
+    _worker_fake = Faker(locale)
+    _worker_pools = pools
+
+
+def _build_users_batch(seed: int, start: int, size: int, password_hash: str,
+                       active_rate: float) -> List[Tuple]:
+    """构建一批用户数据"""
+    random.seed(seed)
+    # 随机列整批抽样，循环内只做组装
+    rand = random.random
+    domains = random.choices(_worker_pools['email_domain'], k=size)
+    users_batch = [None] * size
+    
+    for j, domain in enumerate(domains):
+        # 生成随机状态
+        status = 1 if rand() < active_rate else 0
+        
+        # 序号保证用户名唯一，邮箱域名从预生成池中选取
+        username = f"u_{start+j}"
+        users_batch[j] = (username, f"{username}@{domain}", password_hash, status)
+    
+    return users_batch
+
+
+def _build_roles_batch(seed: int, start: int, size: int,
+                       categories: List[str]) -> List[Tuple]:
+    """构建一批角色数据"""
+    random.seed(seed)
+    category_picks = random.choices(categories, k=size)
+    level_picks = random.choices(('junior', 'senior', 'lead', 'manager'), k=size)
+    company_pool = _worker_pools['company']
+    roles_batch = [None] * size
+    
+    for j, (category, level) in enumerate(zip(category_picks, level_picks)):
+        department = company_pool[(start + j) % COMPANY_POOL_SIZE]
+        
+        roles_batch[j] = (f"{department} {level} {category}", f"{category}_{level}_{start+j}", 1)
+    
+    return roles_batch
+
+
+def _build_permissions_batch(seed: int, start: int, size: int, modules: List[str],
+                             actions: List[str]) -> List[Tuple]:
+    """构建一批权限数据"""
+    random.seed(seed)
+    _worker_fake.seed_instance(seed)
+    module_picks = random.choices(modules, k=size)
+    action_picks = random.choices(actions, k=size)
+    words = _worker_fake.words(nb=size)
+    permissions_batch = [None] * size
+    
+    for j, (module, action, resource_detail) in enumerate(zip(module_picks, action_picks, words)):
+        permissions_batch[j] = (
+            f"{module} {action} {resource_detail}",
+            f"{module}:{action}:{resource_detail}_{start+j}",
+            module,
+            action
+        )
+    
+    return permissions_batch
+
+
+def _gen_audit_numeric(rng: 'np.random.Generator', n: int, n_users: int, n_actions: int,
+                       success_rate: float, max_seconds: int) -> Tuple[np.ndarray, ...]:
+    """
+    一次性生成一批操作日志的数值列
+    
+    Args:
+        rng: NumPy随机数生成器
+        n: 行数
+        n_users: 用户ID数量
+        n_actions: 操作类型数量
+        success_rate: 成功比例
+        max_seconds: 时间偏移上限（秒）
+        
+    Returns:
+        Tuple[np.ndarray, ...]: (user_idx, action_idx, action_result, offset_seconds, resource_id)
+    """
+    user_idx = rng.integers(0, n_users, size=n)
+    action_idx = rng.integers(0, n_actions, size=n)
+    action_result = (rng.random(n) < success_rate).astype(np.int64)
+    offset_seconds = rng.integers(0, max_seconds, size=n)
+    resource_id = rng.integers(1, 10001, size=n)
+    return user_idx, action_idx, action_result, offset_seconds, resource_id
+
+
+def _build_audit_logs_batch(seed: int, size: int, user_ids: List[int],
+                            resource_by_action: Dict[str, str], success_rate: float) -> List[Tuple]:
+    """
+    构建一批操作日志数据
+    
+    Args:
+        resource_by_action: 操作类型到资源类型的映射，由父进程预先计算
+    """
+    rng = np.random.default_rng(seed)
+    # 时间基准每批取一次，行时间为其前30天内的随机秒数
+    now = np.datetime64(datetime.now(), 's')
+    max_seconds = 30 * 86400
+    ip_pool = _worker_pools['ip']
+    ua_pool = _worker_pools['user_agent']
+    sentence_pool = _worker_pools['sentence']
+    action_types = tuple(resource_by_action)
+    
+    # 数值列整批向量化生成，字符串列再按下标从取值池中选取
+    user_idx, action_idx, action_result, offset_seconds, resource_id = _gen_audit_numeric(
+        rng, size, len(user_ids), len(action_types), success_rate, max_seconds
+    )
+    # 时间整批格式化为字符串，不为每行创建datetime对象：
+    # request_data使用ISO格式，created_at使用MySQL的'YYYY-MM-DD HH:MM:SS'格式
+    iso_col = np.datetime_as_string(now - offset_seconds.astype('timedelta64[s]'), unit='s')
+    created_at_col = np.char.replace(iso_col, 'T', ' ').tolist()
+    iso_col = iso_col.tolist()
+    ip_idx = rng.integers(0, len(ip_pool), size=size).tolist()
+    ua_idx = rng.integers(0, len(ua_pool), size=size).tolist()
+    sentence_idx = rng.integers(0, len(sentence_pool), size=size).tolist()
+    
+    # 每种操作类型的资源类型和request_data前缀（时间戳之前的部分）
+    action_fields = [(resource_by_action[action_type], '{"action": "%s", "timestamp": "' % action_type)
+                     for action_type in action_types]
+    logs_batch = [None] * size
+    
+    columns = zip(user_idx.tolist(), action_idx.tolist(), action_result.tolist(),
+                  resource_id.tolist(), iso_col, created_at_col, ip_idx, ua_idx, sentence_idx)
+    for j, (u, a, ok, rid, iso, created_at, ip, ua, sentence) in enumerate(columns):
+        resource_type, request_prefix = action_fields[a]
+        
+        # 字段顺序与AUDIT_LOG_COLUMNS一致
+        logs_batch[j] = (
+            user_ids[u],
+            action_types[a],
+            resource_type,
+            str(rid),
+            ok,
+            ip_pool[ip],
+            ua_pool[ua],
+            request_prefix + iso + '"}',
+            SUCCESS_RESPONSE_DATA if ok else FAILED_RESPONSE_DATA,
+            None if ok else sentence_pool[sentence],
+            created_at
+        )
+    
+    return logs_batch
+
 
 class DataGenerator:
     """测试数据生成器"""
@@ -48,13 +356,26 @@ class DataGenerator:
         """
         self.config = get_config(config_env)
         self.scenario_config = get_scenario(scenario)
+        BaseProvider.random_element = _fast_random_element
         self.fake = Faker(self.config.FAKER['locale'])
         
         # 设置日志
         self._setup_logging()
         
+        # 预生成随机取值池
+        self._init_value_pools()
+        
         # 初始化数据库连接
-        db_config = DatabaseConfig(**self.config.DATABASE)
+        db_config = DatabaseConfig(**self.config.DATABASE,
+                                   local_infile=self.config.BULK_LOAD['local_infile'])
+        # 服务端未开启local_infile时会回退为多值INSERT
+        self._load_data_enabled = self.config.BULK_LOAD['local_infile']
+        # 服务端不支持递归CTE（MySQL 8以下）时回退为Python端生成
+        self._server_side_enabled = self.config.BULK_LOAD['server_side_generation']
+        # 当前生成步骤的事务连接（见_load_session）
+        self._conn = None
+        # 批次构建进程池（首次使用时创建）
+        self._executor = None
         try:
             self.db_manager = DatabaseManager(
                 db_config,
@@ -67,8 +388,8 @@ class DataGenerator:
             self.logger.error(f"数据库连接失败: {str(e)}")
             raise Exception(f"无法连接到数据库 {db_config.host}:{db_config.port}/{db_config.database}。请确保MySQL服务已启动。")
         
-        # 线程锁
-        self.lock = threading.Lock()
+        # 后台写线程：生成下一批的同时写入上一批
+        self._start_writer()
         
         # 统计信息
         self.stats = {
@@ -97,6 +418,68 @@ class DataGenerator:
             self.logger.error(f"数据库连接测试失败: {str(e)}")
             raise
 
+    def _init_value_pools(self):
+        """预生成Faker取值池，生成循环中只做随机选取"""
+        fake = self.fake
+        self._ua_pool = [fake.user_agent() for _ in range(USER_AGENT_POOL_SIZE)]
+        self._sentence_pool = [fake.sentence() for _ in range(SENTENCE_POOL_SIZE)]
+        self._email_domain_pool = [fake.free_email_domain() for _ in range(EMAIL_DOMAIN_POOL_SIZE)]
+        octets = np.random.randint(0, 256, size=(IP_POOL_SIZE, 4)).astype(str)
+        self._ip_pool = ['.'.join(row) for row in octets]
+        self._company_pool = [fake.company()[:20] for _ in range(COMPANY_POOL_SIZE)]
+    
+    def _progress(self, total: int, desc: str) -> tqdm:
+        """
+        创建进度条
+        
+        按总量的约千分之一刷新且间隔不小于0.5秒，避免逐批刷新终端。
+        """
+        return tqdm(total=total, desc=desc, miniters=max(1, total // 1000), mininterval=0.5)
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """获取批次构建进程池，子进程数量与CPU核数一致"""
+        if self._executor is None:
+            pools = {
+                'user_agent': self._ua_pool,
+                'sentence': self._sentence_pool,
+                'email_domain': self._email_domain_pool,
+                'ip': self._ip_pool,
+                'company': self._company_pool
+            }
+            # 写线程此时已在运行，fork出的子进程可能继承其持有的锁而死锁，
+            # 改用forkserver（不支持时用spawn）启动；子进程状态全部经initializer传入
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_worker,
+                initargs=(self.config.FAKER['locale'], pools)
+            )
+        return self._executor
+    
+    def _iter_batches(self, build_func, jobs):
+        """
+        在进程池中构建批次，按提交顺序逐个返回结果
+        
+        同时在途的批次数量限制为子进程数的两倍，避免构建速度超过写入速度时
+        结果在内存中堆积。
+        
+        Args:
+            build_func: 模块级批次构建函数
+            jobs: 每个批次的参数元组（不含种子，种子由本方法分配）
+        """
+        executor = self._get_executor()
+        max_in_flight = 2 * (os.cpu_count() or 1)
+        pending = deque()
+        
+        for job in jobs:
+            pending.append(executor.submit(build_func, random.getrandbits(32), *job))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        
+        while pending:
+            yield pending.popleft().result()
+    
     def _setup_logging(self):
         """设置日志"""
         logging.basicConfig(
@@ -124,37 +507,36 @@ class DataGenerator:
         
         batch_size = self.config.DATA_GENERATION['users']['batch_size']
         default_password = self.config.DATA_GENERATION['users']['default_password']
+        active_rate = self.config.DATA_GENERATION['users']['status_distribution']['active']
         
         self.logger.info(f"开始生成 {count} 个用户...")
         
-        # 预先生成密码哈希
-        password_hash = hash_password(default_password)
+        # 预先生成密码哈希（进程内缓存）
+        password_hash = _cached_password_hash(default_password)
+        
+        # 大数据量时使用LOAD DATA批量加载
+        use_load_data = count >= self.config.BULK_LOAD['load_data_threshold']
         
         try:
-            with tqdm(total=count, desc="生成用户") as pbar:
-                for i in range(0, count, batch_size):
-                    current_batch_size = min(batch_size, count - i)
-                    users_batch = []
-                    
-                    for j in range(current_batch_size):
-                        # 生成随机状态
-                        status = 1 if random.random() < self.config.DATA_GENERATION['users']['status_distribution']['active'] else 0
-                        
-                        user = {
-                            'username': self.fake.user_name() + f"_{i+j}",
-                            'email': self.fake.email(),
-                            'password_hash': password_hash,
-                            'status': status
-                        }
-                        users_batch.append(user)
-                    
+            # 优先在服务端直接生成
+            if self._server_side_enabled:
+                inserted = self._insert_select(USERS_INSERT_SELECT_SQL,
+                                               (count - 1, password_hash, active_rate), count)
+                if inserted is not None:
+                    self.stats['users_generated'] += inserted
+                    self.logger.info(f"用户生成完成（服务端）: {inserted} 条记录")
+                    return True
+            
+            jobs = ((i, min(batch_size, count - i), password_hash, active_rate)
+                    for i in range(0, count, batch_size))
+            
+            with self._load_session(), self._progress(count, "生成用户") as pbar:
+                for users_batch in self._iter_batches(_build_users_batch, jobs):
                     # 批量插入
-                    self._insert_users_batch(users_batch)
+                    self._submit_write('users_generated', self._insert_users_batch,
+                                       users_batch, use_load_data)
                     
-                    with self.lock:
-                        self.stats['users_generated'] += current_batch_size
-                    
-                    pbar.update(current_batch_size)
+                    pbar.update(len(users_batch))
             
             self.logger.info(f"用户生成完成: {self.stats['users_generated']} 条记录")
             return True
@@ -164,13 +546,247 @@ class DataGenerator:
             self.stats['errors'].append(f"用户生成错误: {str(e)}")
             return False
     
-    def _insert_users_batch(self, users: List[Dict[str, Any]]):
-        """批量插入用户"""
-        sql = """
-        INSERT INTO users (username, email, password_hash, status)
-        VALUES (%(username)s, %(email)s, %(password_hash)s, %(status)s)
+    def _start_writer(self):
+        """启动后台写线程"""
+        self._write_q = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._write_error = None
+        writer = threading.Thread(target=self._writer_loop, name='data-writer', daemon=True)
+        writer.start()
+    
+    def _writer_loop(self):
+        """写线程主循环：依次执行队列中的写入任务并累加统计"""
+        while True:
+            stat_key, write_func, args = self._write_q.get()
+            try:
+                # 已有写入失败时丢弃后续批次，由_flush_writes抛出错误
+                if self._write_error is None:
+                    # 统计只由写线程更新，主线程在_flush_writes之后才读取，无需加锁
+                    self.stats[stat_key] += write_func(*args)
+            except Exception as e:
+                self._write_error = e
+            finally:
+                self._write_q.task_done()
+    
+    def _submit_write(self, stat_key: str, write_func, *args):
+        """
+        提交一批写入任务到后台写线程
+        
+        队列满时阻塞，生成端最多领先WRITE_QUEUE_SIZE批。
+        
+        Args:
+            stat_key: 写入成功后累加的统计项
+            write_func: 写入方法，返回写入条数
+            *args: 写入方法参数
+        """
+        if self._write_error is not None:
+            raise self._write_error
+        self._write_q.put((stat_key, write_func, args))
+    
+    def _flush_writes(self):
+        """等待已提交的写入全部完成，写入失败时抛出异常"""
+        self._write_q.join()
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+    
+    @contextmanager
+    def _load_session(self, relax_checks: bool = False):
+        """
+        在单个事务中执行一个生成步骤
+        
+        步骤内的所有批次复用同一连接，结束时只提交一次，避免每批一次fsync。
+        
+        Args:
+            relax_checks: 是否临时关闭外键检查（关联表加载使用，调用方须保证引用的ID均已存在）。
+                唯一性检查始终保持开启：关联表依赖INSERT IGNORE按唯一键去重，
+                关闭unique_checks后InnoDB可能跳过二级唯一索引的重复检查
+        """
+        # 生成期间产生大量短命元组，暂停循环GC避免频繁的分代回收
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with self.db_manager.get_connection() as conn:
+                # 会话参数在begin()之前设置，事务结束后再恢复
+                with self.db_manager.get_cursor(conn) as cursor:
+                    binlog_disabled = self._apply_session_settings(cursor)
+                    if relax_checks:
+                        cursor.execute("SET SESSION foreign_key_checks = 0")
+                try:
+                    conn.begin()
+                    self._conn = conn
+                    committed = False
+                    try:
+                        yield conn
+                        self._flush_writes()
+                        conn.commit()
+                        committed = True
+                    finally:
+                        # 异常退出时也要等写线程用完连接，再回滚
+                        self._write_q.join()
+                        self._write_error = None
+                        self._conn = None
+                        if not committed:
+                            conn.rollback()
+                            self.logger.error("生成步骤失败，事务已回滚")
+                finally:
+                    with self.db_manager.get_cursor(conn) as cursor:
+                        # 连接会归还到连接池，恢复binlog和约束检查
+                        if binlog_disabled:
+                            self._restore_session_settings(cursor)
+                        if relax_checks:
+                            cursor.execute("SET SESSION foreign_key_checks = 1")
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    
+    def _apply_session_settings(self, cursor) -> bool:
+        """
+        逐条应用BULK_SESSION_SETTINGS，单项失败只记录警告（须在事务外调用）
+        
+        Returns:
+            bool: 是否已关闭binlog写入
+        """
+        binlog_disabled = False
+        for sql in BULK_SESSION_SETTINGS:
+            try:
+                cursor.execute(sql)
+            except pymysql.err.MySQLError as e:
+                self.logger.warning(f"会话参数设置失败，已跳过: {sql} ({str(e)})")
+            else:
+                binlog_disabled = binlog_disabled or 'sql_log_bin' in sql
+        return binlog_disabled
+    
+    def _restore_session_settings(self, cursor):
+        """恢复会话的binlog写入（须在事务结束后调用）"""
+        try:
+            cursor.execute("SET SESSION sql_log_bin = 1")
+        except pymysql.err.MySQLError as e:
+            self.logger.warning(f"恢复binlog写入失败: {str(e)}")
+    
+    @contextmanager
+    def _write_cursor(self):
+        """获取写入游标：处于生成事务中时复用事务连接，否则单独取连接并在结束时提交"""
+        if self._conn is not None:
+            with self.db_manager.get_cursor(self._conn) as cursor:
+                yield cursor
+        else:
+            with self.db_manager.get_connection() as conn:
+                with self.db_manager.get_cursor(conn) as cursor:
+                    yield cursor
+                conn.commit()
+    
+    def _insert_select(self, sql: str, params: Sequence[Any], count: int):
+        """
+        执行服务端生成的 INSERT ... WITH RECURSIVE ... SELECT 语句
+        
+        Args:
+            sql: 以SEQUENCE_CTE生成序列的插入语句
+            params: 语句参数（第一个为序列上限count-1）
+            count: 生成数量，用于放宽递归深度限制
+            
+        Returns:
+            Optional[int]: 插入条数；服务端不支持时返回None，调用方回退为Python端生成
+        """
+        # CTE的锚点行总会产生一行，数量为0时不能发送语句
+        if count <= 0:
+            return 0
+        
+        try:
+            with self._load_session():
+                with self._write_cursor() as cursor:
+                    cursor.execute("SET SESSION cte_max_recursion_depth = %s", (max(count, 1000),))
+                    return cursor.execute(sql, params)
+        except (pymysql.err.ProgrammingError, pymysql.err.OperationalError) as e:
+            self.logger.warning(f"服务端生成不可用，改用Python端生成: {str(e)}")
+            self._server_side_enabled = False
+            return None
+    
+    def _multi_values_insert(self, table: str, columns: Sequence[str],
+                             rows: Sequence[Sequence[Any]], ignore: bool = False) -> int:
         """
-        self.db_manager.execute_batch(sql, users)
+        以多值INSERT写入一批数据
+        
+        每MULTI_VALUES_CHUNK_SIZE行拼成一条 INSERT ... VALUES (...),(...) 语句，
+        整批只需少量网络往返，MySQL也只解析一次语句。
+        
+        Args:
+            table: 表名
+            columns: 列名序列
+            rows: 按columns顺序排列的行数据
+            ignore: 是否使用INSERT IGNORE
+            
+        Returns:
+            int: 影响的总行数
+        """
+        if not rows:
+            return 0
+        
+        verb = 'INSERT IGNORE' if ignore else 'INSERT'
+        prefix = f"{verb} INTO {table} ({', '.join(columns)}) VALUES "
+        row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        
+        affected_rows = 0
+        with self._write_cursor() as cursor:
+            for start in range(0, len(rows), MULTI_VALUES_CHUNK_SIZE):
+                chunk = rows[start:start + MULTI_VALUES_CHUNK_SIZE]
+                sql = prefix + ', '.join([row_placeholder] * len(chunk))
+                params = [value for row in chunk for value in row]
+                affected_rows += cursor.execute(sql, params)
+        return affected_rows
+    
+    def _bulk_load(self, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> int:
+        """
+        以 LOAD DATA LOCAL INFILE 写入一批数据
+        
+        行数据先写入临时TSV文件，再由MySQL一次性加载，适合大批量场景。
+        
+        Args:
+            table: 表名
+            columns: 列名序列
+            rows: 按columns顺序排列的行数据
+            
+        Returns:
+            int: 影响的总行数
+        """
+        if not rows:
+            return 0
+        
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.tsv',
+                                         delete=False) as f:
+            for row in rows:
+                f.write('\t'.join(map(_to_tsv_field, row)))
+                f.write('\n')
+            data_file = f.name
+        
+        sql = (
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+            f"({', '.join(columns)})"
+        )
+        try:
+            with self._write_cursor() as cursor:
+                return cursor.execute(sql, (data_file,))
+        finally:
+            os.remove(data_file)
+    
+    def _write_rows(self, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]],
+                    use_load_data: bool = False) -> int:
+        """
+        写入一批数据，大批量时优先使用 LOAD DATA
+        
+        服务端禁用LOCAL INFILE时记录警告，并在本次运行中改用多值INSERT。
+        """
+        if use_load_data and self._load_data_enabled:
+            try:
+                return self._bulk_load(table, columns, rows)
+            except pymysql.err.OperationalError as e:
+                self.logger.warning(f"LOAD DATA LOCAL INFILE不可用，改用多值INSERT: {str(e)}")
+                self._load_data_enabled = False
+        return self._multi_values_insert(table, columns, rows)
+    
+    def _insert_users_batch(self, rows: List[Tuple], use_load_data: bool = False) -> int:
+        """批量插入用户（行按USER_COLUMNS顺序），返回插入条数"""
+        return self._write_rows('users', USER_COLUMNS, rows, use_load_data)
     
     def generate_roles(self, count: int = None) -> bool:
         """生成角色数据"""
@@ -183,29 +799,14 @@ class DataGenerator:
         self.logger.info(f"开始生成 {count} 个角色...")
         
         try:
-            with tqdm(total=count, desc="生成角色") as pbar:
-                for i in range(0, count, batch_size):
-                    current_batch_size = min(batch_size, count - i)
-                    roles_batch = []
-                    
-                    for j in range(current_batch_size):
-                        category = random.choice(categories)
-                        level = random.choice(['junior', 'senior', 'lead', 'manager'])
-                        department = self.fake.company()[:20]
-                        
-                        role = {
-                            'role_name': f"{department} {level} {category}",
-                            'role_code': f"{category}_{level}_{i+j}",
-                            'status': 1
-                        }
-                        roles_batch.append(role)
-                    
-                    self._insert_roles_batch(roles_batch)
-                    
-                    with self.lock:
-                        self.stats['roles_generated'] += current_batch_size
+            jobs = ((i, min(batch_size, count - i), categories)
+                    for i in range(0, count, batch_size))
+            
+            with self._load_session(), self._progress(count, "生成角色") as pbar:
+                for roles_batch in self._iter_batches(_build_roles_batch, jobs):
+                    self._submit_write('roles_generated', self._insert_roles_batch, roles_batch)
                     
-                    pbar.update(current_batch_size)
+                    pbar.update(len(roles_batch))
             
             self.logger.info(f"角色生成完成: {self.stats['roles_generated']} 条记录")
             return True
@@ -215,13 +816,9 @@ class DataGenerator:
             self.stats['errors'].append(f"角色生成错误: {str(e)}")
             return False
     
-    def _insert_roles_batch(self, roles: List[Dict[str, Any]]):
-        """批量插入角色"""
-        sql = """
-        INSERT INTO roles (role_name, role_code, status)
-        VALUES (%(role_name)s, %(role_code)s, %(status)s)
-        """
-        self.db_manager.execute_batch(sql, roles)
+    def _insert_roles_batch(self, rows: List[Tuple]) -> int:
+        """批量插入角色（行按ROLE_COLUMNS顺序），返回插入条数"""
+        return self._multi_values_insert('roles', ROLE_COLUMNS, rows)
     
     def generate_permissions(self, count: int = None) -> bool:
         """生成权限数据"""
@@ -235,30 +832,24 @@ class DataGenerator:
         self.logger.info(f"开始生成 {count} 个权限...")
         
         try:
-            with tqdm(total=count, desc="生成权限") as pbar:
-                for i in range(0, count, batch_size):
-                    current_batch_size = min(batch_size, count - i)
-                    permissions_batch = []
-                    
-                    for j in range(current_batch_size):
-                        module = random.choice(modules)
-                        action = random.choice(actions)
-                        resource_detail = self.fake.word()
-                        
-                        permission = {
-                            'permission_name': f"{module} {action} {resource_detail}",
-                            'permission_code': f"{module}:{action}:{resource_detail}_{i+j}",
-                            'resource_type': module,
-                            'action_type': action
-                        }
-                        permissions_batch.append(permission)
-                    
-                    self._insert_permissions_batch(permissions_batch)
-                    
-                    with self.lock:
-                        self.stats['permissions_generated'] += current_batch_size
+            # 优先在服务端直接生成
+            if self._server_side_enabled:
+                sql = _permissions_insert_select_sql(len(modules), len(actions))
+                inserted = self._insert_select(sql, (count - 1, *modules, *actions), count)
+                if inserted is not None:
+                    self.stats['permissions_generated'] += inserted
+                    self.logger.info(f"权限生成完成（服务端）: {inserted} 条记录")
+                    return True
+            
+            jobs = ((i, min(batch_size, count - i), modules, actions)
+                    for i in range(0, count, batch_size))
+            
+            with self._load_session(), self._progress(count, "生成权限") as pbar:
+                for permissions_batch in self._iter_batches(_build_permissions_batch, jobs):
+                    self._submit_write('permissions_generated', self._insert_permissions_batch,
+                                       permissions_batch)
                     
-                    pbar.update(current_batch_size)
+                    pbar.update(len(permissions_batch))
             
             self.logger.info(f"权限生成完成: {self.stats['permissions_generated']} 条记录")
             return True
@@ -268,13 +859,41 @@ class DataGenerator:
             self.stats['errors'].append(f"权限生成错误: {str(e)}")
             return False
     
-    def _insert_permissions_batch(self, permissions: List[Dict[str, Any]]):
-        """批量插入权限"""
-        sql = """
-        INSERT INTO permissions (permission_name, permission_code, resource_type, action_type)
-        VALUES (%(permission_name)s, %(permission_code)s, %(resource_type)s, %(action_type)s)
+    def _insert_permissions_batch(self, rows: List[Tuple]) -> int:
+        """批量插入权限（行按PERMISSION_COLUMNS顺序），返回插入条数"""
+        return self._multi_values_insert('permissions', PERMISSION_COLUMNS, rows)
+
+    def _fetch_ids(self, table: str, where: str = None) -> Sequence[int]:
+        """
+        获取表中满足条件的全部ID
+        
+        刚生成的数据ID通常连续，此时直接返回range，不在内存中物化ID；
+        不连续时用服务端游标流式读取到紧凑的array('q')中，避免结果集字典列表的开销。
+        
+        Args:
+            table: 表名
+            where: 可选的过滤条件
+            
+        Returns:
+            Sequence[int]: ID序列（range或array）
         """
-        self.db_manager.execute_batch(sql, permissions)
+        condition = f" WHERE {where}" if where else ""
+        bounds = self.db_manager.execute_query(
+            f"SELECT MIN(id) AS min_id, MAX(id) AS max_id, COUNT(*) AS total FROM {table}{condition}"
+        )[0]
+        if not bounds['total']:
+            return array('q')
+        
+        min_id, max_id = bounds['min_id'], bounds['max_id']
+        if max_id - min_id + 1 == bounds['total']:
+            return range(min_id, max_id + 1)
+        
+        ids = array('q')
+        with self.db_manager.get_connection() as conn:
+            with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+                cursor.execute(f"SELECT id FROM {table}{condition}")
+                ids.extend(row[0] for row in cursor)
+        return ids
 
     def generate_user_roles(self) -> bool:
         """生成用户角色关联数据"""
@@ -282,54 +901,42 @@ class DataGenerator:
 
         try:
             # 获取所有用户和角色ID
-            users = self.db_manager.execute_query("SELECT id FROM users WHERE status = 1")
-            roles = self.db_manager.execute_query("SELECT id FROM roles WHERE status = 1")
+            user_ids = self._fetch_ids('users', 'status = 1')
+            role_ids = self._fetch_ids('roles', 'status = 1')
 
-            if not users or not roles:
+            if not user_ids or not role_ids:
                 self.logger.error("没有找到用户或角色数据")
                 return False
 
-            user_ids = [user['id'] for user in users]
-            role_ids = [role['id'] for role in roles]
-
             batch_size = self.config.DATA_GENERATION['user_roles']['batch_size']
             min_roles = self.config.DATA_GENERATION['user_roles']['min_roles']
             max_roles = self.config.DATA_GENERATION['user_roles']['max_roles']
 
-            total_relations = 0
-
-            with tqdm(total=len(user_ids), desc="生成用户角色关联") as pbar:
-                user_roles_batch = []
-
-                for user_id in user_ids:
-                    # 为每个用户随机分配角色
-                    num_roles = random.randint(min_roles, max_roles)
-                    selected_roles = random.sample(role_ids, min(num_roles, len(role_ids)))
-
-                    for role_id in selected_roles:
-                        user_role = {
-                            'user_id': user_id,
-                            'role_id': role_id,
-                            'assigned_by': random.choice(user_ids),
-                            'status': 1
-                        }
-                        user_roles_batch.append(user_role)
-                        total_relations += 1
-
-                        # 批量插入
-                        if len(user_roles_batch) >= batch_size:
-                            self._insert_user_roles_batch(user_roles_batch)
-                            with self.lock:
-                                self.stats['user_roles_generated'] += len(user_roles_batch)
-                            user_roles_batch = []
-
-                    pbar.update(1)
-
-                # 插入剩余数据
-                if user_roles_batch:
-                    self._insert_user_roles_batch(user_roles_batch)
-                    with self.lock:
-                        self.stats['user_roles_generated'] += len(user_roles_batch)
+            # 向量化抽样：每个用户的角色数、角色和分配人一次性生成。
+            # 角色按用户无放回抽取（同random.sample），不产生重复的(user_id, role_id)。
+            user_id_arr = _ids_to_ndarray(user_ids)
+            role_id_arr = _ids_to_ndarray(role_ids)
+            counts = np.random.randint(min_roles, max_roles + 1, size=len(user_id_arr))
+            np.minimum(counts, len(role_id_arr), out=counts)
+            total_relations = int(counts.sum())
+
+            user_col = np.repeat(user_id_arr, counts)
+            role_col = _sample_distinct_per_row(role_id_arr, counts)
+            assigned_by_col = np.random.choice(user_id_arr, size=total_relations)
+
+            with self._load_session(relax_checks=True), \
+                    self._progress(total_relations, "生成用户角色关联") as pbar:
+                for start in range(0, total_relations, batch_size):
+                    end = start + batch_size
+                    rows = list(zip(
+                        user_col[start:end].tolist(),
+                        role_col[start:end].tolist(),
+                        assigned_by_col[start:end].tolist(),
+                        [1] * (min(end, total_relations) - start)
+                    ))
+                    self._submit_write('user_roles_generated', self._insert_user_roles_batch, rows)
+
+                    pbar.update(len(rows))
 
             self.logger.info(f"用户角色关联生成完成: {self.stats['user_roles_generated']} 条记录")
             return True
@@ -339,13 +946,9 @@ class DataGenerator:
             self.stats['errors'].append(f"用户角色关联生成错误: {str(e)}")
             return False
 
-    def _insert_user_roles_batch(self, user_roles: List[Dict[str, Any]]):
-        """批量插入用户角色关联"""
-        sql = """
-        INSERT IGNORE INTO user_roles (user_id, role_id, assigned_by, status)
-        VALUES (%(user_id)s, %(role_id)s, %(assigned_by)s, %(status)s)
-        """
-        self.db_manager.execute_batch(sql, user_roles)
+    def _insert_user_roles_batch(self, rows: List[Tuple[int, int, int, int]]) -> int:
+        """批量插入用户角色关联（行按USER_ROLE_COLUMNS顺序），返回实际插入条数"""
+        return self._multi_values_insert('user_roles', USER_ROLE_COLUMNS, rows, ignore=True)
 
     def generate_role_permissions(self) -> bool:
         """生成角色权限关联数据"""
@@ -353,53 +956,57 @@ class DataGenerator:
 
         try:
             # 获取所有角色和权限ID
-            roles = self.db_manager.execute_query("SELECT id FROM roles WHERE status = 1")
-            permissions = self.db_manager.execute_query("SELECT id FROM permissions")
+            role_ids = self._fetch_ids('roles', 'status = 1')
+            permission_ids = self._fetch_ids('permissions')
             users = self.db_manager.execute_query("SELECT id FROM users WHERE status = 1 LIMIT 100")
 
-            if not roles or not permissions:
+            if not role_ids or not permission_ids:
                 self.logger.error("没有找到角色或权限数据")
                 return False
 
-            role_ids = [role['id'] for role in roles]
-            permission_ids = [perm['id'] for perm in permissions]
             user_ids = [user['id'] for user in users]
 
             batch_size = self.config.DATA_GENERATION['role_permissions']['batch_size']
             min_permissions = self.config.DATA_GENERATION['role_permissions']['min_permissions']
             max_permissions = self.config.DATA_GENERATION['role_permissions']['max_permissions']
 
-            with tqdm(total=len(role_ids), desc="生成角色权限关联") as pbar:
-                role_permissions_batch = []
+            with self._load_session(relax_checks=True), \
+                    self._progress(len(role_ids), "生成角色权限关联") as pbar:
+                # 预分配批次缓冲区，写满后以切片副本提交，缓冲区本身反复复用
+                buffer = [None] * batch_size
+                filled = 0
+                randint = random.randint
+                sample = random.sample
+                choices = random.choices
+                permission_count = len(permission_ids)
 
                 for role_id in role_ids:
                     # 为每个角色随机分配权限
-                    num_permissions = random.randint(min_permissions, max_permissions)
-                    selected_permissions = random.sample(permission_ids, min(num_permissions, len(permission_ids)))
-
-                    for permission_id in selected_permissions:
-                        role_permission = {
-                            'role_id': role_id,
-                            'permission_id': permission_id,
-                            'granted_by': random.choice(user_ids) if user_ids else None,
-                            'status': 1
-                        }
-                        role_permissions_batch.append(role_permission)
+                    num_permissions = randint(min_permissions, max_permissions)
+                    selected_permissions = sample(permission_ids, min(num_permissions, permission_count))
+
+                    # 每个角色的授权人一次性抽样
+                    granters = (choices(user_ids, k=len(selected_permissions)) if user_ids
+                                else [None] * len(selected_permissions))
+
+                    for permission_id, granted_by in zip(selected_permissions, granters):
+                        buffer[filled] = (role_id, permission_id, granted_by, 1)
+                        filled += 1
 
                         # 批量插入
-                        if len(role_permissions_batch) >= batch_size:
-                            self._insert_role_permissions_batch(role_permissions_batch)
-                            with self.lock:
-                                self.stats['role_permissions_generated'] += len(role_permissions_batch)
-                            role_permissions_batch = []
+                        if filled == batch_size:
+                            self._submit_write('role_permissions_generated',
+                                               self._insert_role_permissions_batch,
+                                               buffer[:filled])
+                            filled = 0
 
                     pbar.update(1)
 
                 # 插入剩余数据
-                if role_permissions_batch:
-                    self._insert_role_permissions_batch(role_permissions_batch)
-                    with self.lock:
-                        self.stats['role_permissions_generated'] += len(role_permissions_batch)
+                if filled:
+                    self._submit_write('role_permissions_generated',
+                                       self._insert_role_permissions_batch,
+                                       buffer[:filled])
 
             self.logger.info(f"角色权限关联生成完成: {self.stats['role_permissions_generated']} 条记录")
             return True
@@ -409,13 +1016,9 @@ class DataGenerator:
             self.stats['errors'].append(f"角色权限关联生成错误: {str(e)}")
             return False
 
-    def _insert_role_permissions_batch(self, role_permissions: List[Dict[str, Any]]):
-        """批量插入角色权限关联"""
-        sql = """
-        INSERT IGNORE INTO role_permissions (role_id, permission_id, granted_by, status)
-        VALUES (%(role_id)s, %(permission_id)s, %(granted_by)s, %(status)s)
-        """
-        self.db_manager.execute_batch(sql, role_permissions)
+    def _insert_role_permissions_batch(self, rows: List[Tuple]) -> int:
+        """批量插入角色权限关联（行按ROLE_PERMISSION_COLUMNS顺序），返回实际插入条数"""
+        return self._multi_values_insert('role_permissions', ROLE_PERMISSION_COLUMNS, rows, ignore=True)
 
     def generate_audit_logs(self, count: int = None) -> bool:
         """生成操作日志数据"""
@@ -427,6 +1030,9 @@ class DataGenerator:
         success_rate = self.config.DATA_GENERATION['audit_logs']['success_rate']
 
         self.logger.info(f"开始生成 {count} 条操作日志...")
+        
+        # 大数据量时使用LOAD DATA批量加载
+        use_load_data = count >= self.config.BULK_LOAD['load_data_threshold']
 
         try:
             # 获取用户ID列表
@@ -437,47 +1043,20 @@ class DataGenerator:
 
             user_ids = [user['id'] for user in users]
 
-            with tqdm(total=count, desc="生成操作日志") as pbar:
-                for i in range(0, count, batch_size):
-                    current_batch_size = min(batch_size, count - i)
-                    logs_batch = []
-
-                    for j in range(current_batch_size):
-                        # 生成随机时间（过去30天内）
-                        days_ago = random.randint(0, 30)
-                        hours_ago = random.randint(0, 23)
-                        minutes_ago = random.randint(0, 59)
-
-                        created_at = datetime.now() - timedelta(
-                            days=days_ago,
-                            hours=hours_ago,
-                            minutes=minutes_ago
-                        )
-
-                        action_type = random.choice(action_types)
-                        action_result = 1 if random.random() < success_rate else 0
-
-                        log = {
-                            'user_id': random.choice(user_ids),
-                            'action_type': action_type,
-                            'resource_type': action_type.split('_')[0] if '_' in action_type else 'system',
-                            'resource_id': str(random.randint(1, 10000)),
-                            'action_result': action_result,
-                            'ip_address': self.fake.ipv4(),
-                            'user_agent': self.fake.user_agent(),
-                            'request_data': f'{{"action": "{action_type}", "timestamp": "{created_at.isoformat()}"}}',
-                            'response_data': f'{{"status": "{"success" if action_result else "failed"}", "code": {200 if action_result else 400}}}',
-                            'error_message': None if action_result else self.fake.sentence(),
-                            'created_at': created_at
-                        }
-                        logs_batch.append(log)
-
-                    self._insert_audit_logs_batch(logs_batch)
-
-                    with self.lock:
-                        self.stats['audit_logs_generated'] += current_batch_size
-
-                    pbar.update(current_batch_size)
+            # 资源类型只取决于操作类型，预先计算一次
+            resource_by_action = {
+                action_type: (action_type.split('_', 1)[0] if '_' in action_type else 'system')
+                for action_type in action_types
+            }
+            jobs = ((min(batch_size, count - i), user_ids, resource_by_action, success_rate)
+                    for i in range(0, count, batch_size))
+
+            with self._load_session(), self._progress(count, "生成操作日志") as pbar:
+                for logs_batch in self._iter_batches(_build_audit_logs_batch, jobs):
+                    self._submit_write('audit_logs_generated', self._insert_audit_logs_batch,
+                                       logs_batch, use_load_data)
+
+                    pbar.update(len(logs_batch))
 
             self.logger.info(f"操作日志生成完成: {self.stats['audit_logs_generated']} 条记录")
             return True
@@ -487,18 +1066,9 @@ class DataGenerator:
             self.stats['errors'].append(f"操作日志生成错误: {str(e)}")
             return False
 
-    def _insert_audit_logs_batch(self, logs: List[Dict[str, Any]]):
-        """批量插入操作日志"""
-        sql = """
-        INSERT INTO audit_logs (
-            user_id, action_type, resource_type, resource_id, action_result,
-            ip_address, user_agent, request_data, response_data, error_message, created_at
-        ) VALUES (
-            %(user_id)s, %(action_type)s, %(resource_type)s, %(resource_id)s, %(action_result)s,
-            %(ip_address)s, %(user_agent)s, %(request_data)s, %(response_data)s, %(error_message)s, %(created_at)s
-        )
-        """
-        self.db_manager.execute_batch(sql, logs)
+    def _insert_audit_logs_batch(self, rows: List[Tuple], use_load_data: bool = False) -> int:
+        """批量插入操作日志（行按AUDIT_LOG_COLUMNS顺序），返回插入条数"""
+        return self._write_rows('audit_logs', AUDIT_LOG_COLUMNS, rows, use_load_data)
 
     def generate_all_data(self) -> bool:
         """生成所有测试数据"""
@@ -591,15 +1161,17 @@ class DataGenerator:
         ]
 
         try:
-            for table in tables:
-                sql = f"DELETE FROM {table} WHERE id > 0"
-                affected = self.db_manager.execute_update(sql)
-                self.logger.info(f"清理表 {table}: {affected} 条记录")
-
-            # 重置自增ID
-            for table in tables:
-                sql = f"ALTER TABLE {table} AUTO_INCREMENT = 1"
-                self.db_manager.execute_update(sql)
+            # TRUNCATE直接重建表并重置自增ID，不逐行写undo日志；
+            # 外键检查是会话级设置，需与TRUNCATE在同一连接上执行
+            with self.db_manager.get_connection() as conn:
+                with self.db_manager.get_cursor(conn) as cursor:
+                    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+                    try:
+                        for table in tables:
+                            cursor.execute(f"TRUNCATE TABLE {table}")
+                            self.logger.info(f"清理表 {table}")
+                    finally:
+                        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
 
             self.logger.info("数据清理完成")
 
@@ -607,7 +1179,10 @@ class DataGenerator:
             self.logger.error(f"数据清理失败: {str(e)}")
 
     def close(self):
-        """关闭数据库连接"""
+        """关闭数据库连接和批次构建进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
         if self.db_manager:
             self.db_manager.close()
 
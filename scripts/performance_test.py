@@ -11,42 +11,178 @@ RBAC权限系统性能测试脚本
 import sys
 import os
 import time
+import asyncio
 import threading
-import random
-import statistics
+from array import array
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import logging
 import json
+import multiprocessing
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
     from tqdm import tqdm
+    import numpy as np
     import pymysql
 except ImportError as e:
     print(f"缺少依赖包: {e}")
-    print("请运行: pip install tqdm pymysql")
+    print("请运行: pip install tqdm numpy pymysql")
     sys.exit(1)
 
-from utils.password_utils import verify_password
+try:
+    import aiomysql  # 可选依赖，仅 --async 并发登录测试使用
+except ImportError:
+    aiomysql = None
+
+try:
+    import orjson  # 可选依赖，存在时用于快速写出测试结果
+except ImportError:
+    orjson = None
+
+from utils.password_utils import hash_password, verify_password
 from utils.db_utils import DatabaseManager, DatabaseConfig
 from config.test_config import get_config, get_benchmark
 
+# 测试SQL（模块级常量，测试循环中不再重复构造）
+SQL_LOGIN = "SELECT id, username, password_hash FROM users WHERE username = %s AND status = 1"
+SQL_USER_PERMISSIONS = """
+SELECT DISTINCT p.permission_code
+FROM users u
+JOIN user_roles ur ON u.id = ur.user_id AND ur.status = 1
+JOIN roles r ON ur.role_id = r.id AND r.status = 1
+JOIN role_permissions rp ON r.id = rp.role_id AND rp.status = 1
+JOIN permissions p ON rp.permission_id = p.id
+WHERE u.id = %s AND u.status = 1
+"""
+SQL_BATCH_USER_PERMISSIONS = """
+SELECT u.id as user_id, p.permission_code
+FROM users u
+JOIN user_roles ur ON u.id = ur.user_id AND ur.status = 1
+JOIN roles r ON ur.role_id = r.id AND r.status = 1
+JOIN role_permissions rp ON r.id = rp.role_id AND rp.status = 1
+JOIN permissions p ON rp.permission_id = p.id
+WHERE u.id IN ({placeholders}) AND u.status = 1
+"""
+SQL_CREATE_USER = """
+INSERT INTO users (username, email, password_hash, status)
+VALUES (%s, %s, %s, %s)
+"""
+# 按主键点查预采样的用户ID，避免 ORDER BY RAND() 的全表排序
+SQL_READ_USER = "SELECT id, username, email FROM users WHERE id = %s"
+SQL_UPDATE_USER = "UPDATE users SET updated_at = NOW() WHERE id = %s"
+SQL_ASSIGN_ROLE = """
+INSERT IGNORE INTO user_roles (user_id, role_id, assigned_by, status)
+VALUES (%s, %s, %s, %s)
+"""
+# 批量插入拼成多值 INSERT，每条语句最多 MULTI_VALUES_CHUNK_SIZE 行以免超出 max_allowed_packet
+MULTI_VALUES_CHUNK_SIZE = 1000
+SQL_INSERT_AUDIT_LOGS_PREFIX = (
+    "INSERT INTO audit_logs (user_id, action_type, resource_type, resource_id, "
+    "action_result, ip_address, user_agent) VALUES "
+)
+AUDIT_LOG_ROW_PLACEHOLDER = "(%s, %s, %s, %s, %s, %s, %s)"
+SQL_STRESS_LOGIN = "SELECT id FROM users WHERE username = %s AND status = 1"
+SQL_COUNT_PERMISSIONS = """
+SELECT COUNT(*) as perm_count
+FROM users u
+JOIN user_roles ur ON u.id = ur.user_id AND ur.status = 1
+JOIN role_permissions rp ON ur.role_id = rp.role_id AND rp.status = 1
+WHERE u.id = %s
+"""
+SQL_COUNT_USERS = "SELECT COUNT(*) as user_count FROM users WHERE status = 1"
+
+# 用户权限物化表（--use-mv）：预先展开 用户-角色-权限 关联，查询时单表按主键范围扫描
+SQL_CREATE_USER_PERMISSIONS_MV = """
+CREATE TABLE IF NOT EXISTS user_permissions_mv (
+    user_id BIGINT UNSIGNED NOT NULL,
+    permission_code VARCHAR(100) NOT NULL,
+    PRIMARY KEY (user_id, permission_code)
+) ENGINE=InnoDB
+"""
+SQL_TRUNCATE_USER_PERMISSIONS_MV = "TRUNCATE TABLE user_permissions_mv"
+SQL_REFRESH_USER_PERMISSIONS_MV = """
+INSERT INTO user_permissions_mv (user_id, permission_code)
+SELECT DISTINCT u.id, p.permission_code
+FROM users u
+JOIN user_roles ur ON u.id = ur.user_id AND ur.status = 1
+JOIN roles r ON ur.role_id = r.id AND r.status = 1
+JOIN role_permissions rp ON r.id = rp.role_id AND rp.status = 1
+JOIN permissions p ON rp.permission_id = p.id
+WHERE u.status = 1
+"""
+SQL_MV_USER_PERMISSIONS = "SELECT permission_code FROM user_permissions_mv WHERE user_id = %s"
+SQL_MV_BATCH_USER_PERMISSIONS = """
+SELECT user_id, permission_code FROM user_permissions_mv WHERE user_id IN ({placeholders})
+"""
+SQL_MV_COUNT_PERMISSIONS = "SELECT COUNT(*) as perm_count FROM user_permissions_mv WHERE user_id = %s"
+
+# 进程内权限缓存容量
+PERMISSION_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=PERMISSION_CACHE_SIZE)
+def _cached_permissions(db_manager: DatabaseManager, sql: str, user_id: int) -> Tuple[str, ...]:
+    """
+    按用户ID缓存权限编码，模拟生产环境中的权限缓存
+    
+    Args:
+        db_manager: 数据库管理器
+        sql: 权限查询SQL（关联查询或物化表查询）
+        user_id: 用户ID
+        
+    Returns:
+        Tuple[str, ...]: 用户拥有的权限编码
+    """
+    rows = db_manager.execute_query(sql, (user_id,))
+    return tuple(row['permission_code'] for row in rows)
+
+
+def _dump_results(results: Dict[str, Any], output_file: str):
+    """
+    将测试结果写入JSON文件
+    
+    安装了orjson时直接序列化为字节写出（支持numpy类型，datetime同样经default=str输出），
+    否则回退到标准库json。
+    
+    Args:
+        results: 测试结果
+        output_file: 输出文件路径
+    """
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(results, default=str,
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False, default=str)
+
 
 class PerformanceTest:
     """性能测试类"""
     
-    def __init__(self, config_env: str = None):
+    def __init__(self, config_env: str = None, use_cache: bool = True, use_async: bool = False,
+                 use_mv: bool = False):
         """
         初始化性能测试
         
         Args:
             config_env: 配置环境
+            use_cache: 权限查询测试是否额外测量命中进程内缓存的响应时间
+            use_async: 并发登录测试是否改用 asyncio + aiomysql 驱动
+            use_mv: 权限查询是否改查预先展开的 user_permissions_mv 物化表
         """
+        if use_async and aiomysql is None:
+            raise ImportError("异步并发测试需要 aiomysql，请运行: pip install aiomysql")
+        
         self.config = get_config(config_env)
+        self.use_cache = use_cache
+        self.use_async = use_async
+        self.use_mv = use_mv
         
         # 设置日志
         self._setup_logging()
@@ -78,20 +214,34 @@ class PerformanceTest:
         # 线程锁
         self.lock = threading.Lock()
         
+        # 并发测试共用的线程池，各并发级别之间复用线程，close() 时关闭
+        perf_config = self.config.PERFORMANCE_TEST
+        max_concurrency = max(max(perf_config['authentication']['concurrent_tests']),
+                              perf_config['stress_test']['concurrent_users'])
+        self._executor = ThreadPoolExecutor(max_workers=self._worker_count(max_concurrency),
+                                            thread_name_prefix='perf')
+        
         # 测试数据缓存
-        self.test_users = []
-        self.test_roles = []
-        self.test_permissions = []
+        self.test_users = ()
+        self.test_roles = ()
+        self.test_permissions = ()
+        self._user_ids = np.empty(0, dtype=np.int64)
+        self._usernames = []
+        self._login_sqls = []
+        self._stress_login_sqls = []
+        self._role_ids = np.empty(0, dtype=np.int64)
+        
+        # 实例级随机数生成器（所有随机数都在主线程中按批预先生成）
+        self._rng = np.random.default_rng()
         
         self.logger.info("性能测试初始化完成")
 
     def _test_database_connection(self):
         """测试数据库连接"""
         try:
-            # 执行简单查询测试连接
-            result = self.db_manager.execute_query("SELECT 1 as test")
-            if not result:
-                raise Exception("数据库连接测试失败")
+            # 用协议层ping检查连接，不执行查询
+            with self.db_manager.get_connection() as conn:
+                conn.ping(reconnect=True)
             self.logger.info("数据库连接测试成功")
         except Exception as e:
             self.logger.error(f"数据库连接测试失败: {str(e)}")
@@ -114,35 +264,178 @@ class PerformanceTest:
         self.logger.info("加载测试数据...")
         
         # 加载用户数据
-        users_sql = "SELECT id, username, password_hash FROM users WHERE status = 1 LIMIT 1000"
-        self.test_users = self.db_manager.execute_query(users_sql)
+        users_sql = "SELECT id, username FROM users WHERE status = 1 LIMIT 1000"
+        self.test_users = tuple(self.db_manager.execute_query(users_sql))
         
         # 加载角色数据
         roles_sql = "SELECT id, role_code FROM roles WHERE status = 1 LIMIT 100"
-        self.test_roles = self.db_manager.execute_query(roles_sql)
+        self.test_roles = tuple(self.db_manager.execute_query(roles_sql))
         
         # 加载权限数据
         permissions_sql = "SELECT id, permission_code FROM permissions LIMIT 500"
-        self.test_permissions = self.db_manager.execute_query(permissions_sql)
+        self.test_permissions = tuple(self.db_manager.execute_query(permissions_sql))
+        
+        # 测试循环中按预生成的随机下标取值，不再逐次random.choice
+        self._user_ids = np.fromiter((u['id'] for u in self.test_users), dtype=np.int64,
+                                     count=len(self.test_users))
+        self._usernames = [u['username'] for u in self.test_users]
+        
+        # 用户名取自数据库而非外部输入，预先转义并渲染成完整SQL，
+        # 测试循环中执行无参数语句，免去驱动逐次转义参数
+        with self.db_manager.get_connection() as conn:
+            escaped_usernames = [conn.literal(username) for username in self._usernames]
+        self._login_sqls = [SQL_LOGIN % (escaped,) for escaped in escaped_usernames]
+        self._stress_login_sqls = [SQL_STRESS_LOGIN % (escaped,) for escaped in escaped_usernames]
+        self._role_ids = np.fromiter((r['id'] for r in self.test_roles), dtype=np.int64,
+                                     count=len(self.test_roles))
         
         self.logger.info(f"加载测试数据完成: 用户{len(self.test_users)}个, 角色{len(self.test_roles)}个, 权限{len(self.test_permissions)}个")
+        
+        if self.use_mv:
+            self._refresh_permission_view()
+        
+        self._warm_pool()
     
-    def _measure_time(self, func: Callable, *args, **kwargs) -> Tuple[Any, float]:
+    def _warm_pool(self):
+        """
+        预热连接池
+        
+        同时占用 max_connections 个连接并逐一ping，使所有连接在计时开始前
+        就已建立，TCP握手和认证开销不计入测试结果。
+        """
+        count = self.config.CONNECTION_POOL['max_connections']
+        barrier = threading.Barrier(count)
+        
+        def hold_connection():
+            try:
+                with self.db_manager.get_connection() as conn:
+                    conn.ping(reconnect=True)
+                    # 所有线程都拿到连接后再一起归还，确保池中连接数达到上限
+                    barrier.wait(timeout=30)
+            except threading.BrokenBarrierError:
+                pass
+            except Exception as e:
+                barrier.abort()
+                self.logger.warning(f"连接池预热未完成: {str(e)}")
+        
+        threads = [threading.Thread(target=hold_connection, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.logger.info(f"连接池预热完成: {count}个连接")
+    
+    def _refresh_permission_view(self):
+        """创建并重建 user_permissions_mv 物化表（角色或权限变更后需重新执行）"""
+        self.logger.info("重建用户权限物化表 user_permissions_mv...")
+        self.db_manager.execute_update(SQL_CREATE_USER_PERMISSIONS_MV)
+        self.db_manager.execute_update(SQL_TRUNCATE_USER_PERMISSIONS_MV)
+        rows = self.db_manager.execute_update(SQL_REFRESH_USER_PERMISSIONS_MV)
+        self.logger.info(f"用户权限物化表重建完成: {rows}条")
+    
+    def _random_user_indexes(self, size: int) -> List[int]:
+        """
+        一次性生成size个测试用户下标
+        
+        Args:
+            size: 下标数量
+            
+        Returns:
+            List[int]: 落在[0, len(test_users))内的随机下标
+        """
+        return self._rng.integers(0, len(self._user_ids), size=size).tolist()
+    
+    def _multi_values_insert(self, prefix: str, row_placeholder: str, rows: List[Tuple]) -> int:
+        """
+        以多值INSERT在一个事务内写入一批数据
+        
+        每MULTI_VALUES_CHUNK_SIZE行拼成一条 INSERT ... VALUES (...),(...) 语句，
+        不依赖 executemany 的语句改写。
+        
+        Args:
+            prefix: 截止到 VALUES 的INSERT语句前缀
+            row_placeholder: 单行占位符，如 "(%s, %s)"
+            rows: 行数据
+            
+        Returns:
+            int: 影响的总行数
+        """
+        affected_rows = 0
+        with self.db_manager.transaction() as conn, self.db_manager.get_cursor(conn) as cursor:
+            for start in range(0, len(rows), MULTI_VALUES_CHUNK_SIZE):
+                chunk = rows[start:start + MULTI_VALUES_CHUNK_SIZE]
+                sql = prefix + ', '.join([row_placeholder] * len(chunk))
+                affected_rows += cursor.execute(sql, [value for row in chunk for value in row])
+        return affected_rows
+    
+    def _worker_count(self, concurrency: int) -> int:
+        """
+        计算并发测试的工作线程数
+        
+        Args:
+            concurrency: 期望的并发数
+            
+        Returns:
+            int: 不超过连接池最大连接数的线程数
+        """
+        return max(1, min(concurrency, self.config.CONNECTION_POOL['max_connections']))
+    
+    def _progress(self, iterable=None, desc: str = None, total: int = None) -> tqdm:
+        """
+        创建进度条
+        
+        按总量的约1/200刷新且间隔不小于0.1秒，避免亚毫秒级操作逐次写终端；
+        stderr不是终端（如CI）时不输出进度。
+        """
+        if total is None:
+            total = len(iterable)
+        return tqdm(iterable, desc=desc, total=total, miniters=max(1, total // 200),
+                    mininterval=0.1, smoothing=0.05, disable=not sys.stderr.isatty())
+    
+    def _measure_time(self, func: Callable, *args, **kwargs) -> Tuple[Any, int]:
         """
         测量函数执行时间
         
+        使用单调的 perf_counter_ns，样本以整数纳秒保存，汇总时再由
+        _summarize 统一换算为秒。
+        
         Args:
             func: 要测量的函数
             *args: 函数参数
             **kwargs: 函数关键字参数
             
         Returns:
-            Tuple[Any, float]: (函数返回值, 执行时间)
+            Tuple[Any, int]: (函数返回值, 执行时间纳秒数)
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        end_time = time.time()
-        return result, end_time - start_time
+        return result, time.perf_counter_ns() - start_ns
+    
+    @staticmethod
+    def _summarize(samples: List[int]) -> Dict[str, Any]:
+        """
+        汇总一组耗时样本
+        
+        样本一次性转换为NumPy数组后计算全部统计量，不再对Python列表多次遍历。
+        
+        Args:
+            samples: 以纳秒计的耗时样本（非空）
+            
+        Returns:
+            Dict[str, Any]: 次数及平均/最小/最大/中位/P95/P99耗时（秒）
+        """
+        times = np.asarray(samples, dtype=np.float64) * 1e-9
+        median_time, p95_time, p99_time = np.percentile(times, (50, 95, 99)).tolist()
+        return {
+            'count': int(times.size),
+            'avg_time': float(times.mean()),
+            'min_time': float(times.min()),
+            'max_time': float(times.max()),
+            'median_time': median_time,
+            'p95_time': p95_time,
+            'p99_time': p99_time
+        }
     
     def test_user_authentication(self) -> Dict[str, Any]:
         """测试用户认证性能"""
@@ -158,74 +451,180 @@ class PerformanceTest:
         self.logger.info("执行单次登录测试...")
         single_times = []
         
-        for _ in tqdm(range(config['single_login_tests']), desc="单次登录测试"):
-            user = random.choice(self.test_users)
-            
-            def single_login():
-                # 模拟登录验证过程
-                sql = "SELECT id, username, password_hash FROM users WHERE username = %s AND status = 1"
-                result = self.db_manager.execute_query(sql, (user['username'],))
-                if result:
-                    # 模拟密码验证（实际场景中会验证密码）
-                    return len(result) > 0
-                return False
-            
-            _, exec_time = self._measure_time(single_login)
-            single_times.append(exec_time)
-        
-        results['single_login'] = {
-            'count': len(single_times),
-            'avg_time': statistics.mean(single_times),
-            'min_time': min(single_times),
-            'max_time': max(single_times),
-            'median_time': statistics.median(single_times),
-            'p95_time': self._percentile(single_times, 95),
-            'p99_time': self._percentile(single_times, 99)
-        }
+        # 模拟登录验证过程（实际场景中还会验证密码）
+        usernames = self._usernames
+        login_sqls = self._login_sqls
+        
+        # 串行测试复用同一连接和游标，不再每次从连接池取连接；
+        # 热循环中直接计时，不经 _measure_time 包装
+        perf_counter_ns = time.perf_counter_ns
+        with self.db_manager.get_cursor() as cursor:
+            for i in self._progress(self._random_user_indexes(config['single_login_tests']), desc="单次登录测试"):
+                start_ns = perf_counter_ns()
+                cursor.execute(login_sqls[i])
+                cursor.fetchall()
+                single_times.append(perf_counter_ns() - start_ns)
+        
+        results['single_login'] = self._summarize(single_times)
+        
+        # 密码校验吞吐测试（bcrypt为CPU密集型，用多进程绕开GIL）
+        results['password_verify'] = self._benchmark_password_verify(
+            config['password_verify_tests'], config['password_hash_rounds'])
         
         # 并发登录测试
+        if self.use_async:
+            waves = [(count, [usernames[i] for i in self._random_user_indexes(count)])
+                     for count in config['concurrent_tests']]
+            results['concurrent_login'] = asyncio.run(
+                self._async_concurrent_login(waves, config['timeout']))
+            self.results['authentication'] = results
+            return results
+        
+        def concurrent_login(login_sql: str):
+            try:
+                result = self.db_manager.execute_query(login_sql)
+                return len(result) > 0 if result else False
+            except Exception:
+                return None
+        
+        # 共用线程池的线程数不超过连接池上限，超出部分在线程池队列中排队，
+        # 避免线程阻塞在取连接上而把等待时间计入响应时间
+        executor = self._executor
+        
         for concurrent_count in config['concurrent_tests']:
             self.logger.info(f"执行{concurrent_count}并发登录测试...")
             
-            concurrent_times = []
             errors = 0
+            indexes = self._random_user_indexes(concurrent_count)
             
-            def concurrent_login():
-                try:
-                    user = random.choice(self.test_users)
-                    sql = "SELECT id, username, password_hash FROM users WHERE username = %s AND status = 1"
-                    result = self.db_manager.execute_query(sql, (user['username'],))
-                    return len(result) > 0 if result else False
-                except Exception:
-                    return None
+            start_time = time.perf_counter()
             
-            start_time = time.time()
+            futures = [executor.submit(concurrent_login, login_sqls[i]) for i in indexes]
             
-            with ThreadPoolExecutor(max_workers=concurrent_count) as executor:
-                futures = [executor.submit(concurrent_login) for _ in range(concurrent_count)]
-                
-                for future in as_completed(futures, timeout=config['timeout']):
-                    try:
-                        result = future.result()
-                        if result is None:
-                            errors += 1
-                    except Exception:
+            for future in as_completed(futures, timeout=config['timeout']):
+                try:
+                    result = future.result()
+                    if result is None:
                         errors += 1
+                except Exception:
+                    errors += 1
             
-            total_time = time.time() - start_time
+            total_time = time.perf_counter() - start_time
             
-            results['concurrent_login'][f'{concurrent_count}_concurrent'] = {
-                'concurrent_users': concurrent_count,
-                'total_time': total_time,
-                'avg_time_per_request': total_time / concurrent_count,
-                'requests_per_second': concurrent_count / total_time,
-                'error_count': errors,
-                'success_rate': (concurrent_count - errors) / concurrent_count
-            }
+            results['concurrent_login'][f'{concurrent_count}_concurrent'] = \
+                self._concurrent_stats(concurrent_count, total_time, errors)
         
         self.results['authentication'] = results
         return results
     
+    def _benchmark_password_verify(self, count: int, rounds: int) -> Dict[str, Any]:
+        """
+        测试多进程下bcrypt密码校验的吞吐量
+        
+        Args:
+            count: 校验次数
+            rounds: bcrypt加密轮数
+            
+        Returns:
+            Dict[str, Any]: 校验吞吐测试结果
+        """
+        self.logger.info(f"执行密码校验吞吐测试 ({count}次, {rounds}轮bcrypt)...")
+        
+        password = 'PerfTest@2025'
+        hashed = hash_password(password, rounds=rounds)
+        workers = os.cpu_count() or 1
+        
+        # 此时线程池和连接池已在运行，fork出的子进程可能继承其持有的锁而死锁，
+        # 改用forkserver（不支持时用spawn）启动
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context(start_method)) as executor:
+            # 先让每个子进程完成启动，进程创建开销不计入测试时间
+            list(executor.map(verify_password, [password] * workers, [hashed] * workers))
+            
+            start_time = time.perf_counter()
+            verified = sum(executor.map(verify_password, [password] * count, [hashed] * count,
+                                        chunksize=8))
+            total_time = time.perf_counter() - start_time
+        
+        return {
+            'count': count,
+            'workers': workers,
+            'rounds': rounds,
+            'verified': verified,
+            'total_time': total_time,
+            'avg_time_per_verify': total_time / count,
+            'verifies_per_second': count / total_time
+        }
+    
+    @staticmethod
+    def _concurrent_stats(concurrent_count: int, total_time: float, errors: int) -> Dict[str, Any]:
+        """汇总一轮并发登录测试的结果"""
+        return {
+            'concurrent_users': concurrent_count,
+            'total_time': total_time,
+            'avg_time_per_request': total_time / concurrent_count,
+            'requests_per_second': concurrent_count / total_time,
+            'error_count': errors,
+            'success_rate': (concurrent_count - errors) / concurrent_count
+        }
+    
+    async def _async_concurrent_login(self, waves: List[Tuple[int, List[str]]],
+                                      timeout: float) -> Dict[str, Dict[str, Any]]:
+        """
+        用 asyncio + aiomysql 执行并发登录测试
+        
+        单线程事件循环驱动全部在途查询，不受线程数和GIL切换的限制。
+        
+        Args:
+            waves: 每轮的 (并发数, 登录用户名列表)
+            timeout: 每轮的超时时间（秒）
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: 以 "<并发数>_concurrent" 为键的各轮结果
+        """
+        db_config = self.config.DATABASE
+        pool = await aiomysql.create_pool(
+            host=db_config['host'],
+            port=db_config['port'],
+            user=db_config['user'],
+            password=db_config['password'],
+            db=db_config['database'],
+            charset=db_config['charset'],
+            minsize=self.config.CONNECTION_POOL['min_connections'],
+            maxsize=self.config.CONNECTION_POOL['max_connections'],
+            autocommit=True
+        )
+        
+        async def async_login(username: str):
+            try:
+                async with pool.acquire() as conn:
+                    async with conn.cursor() as cursor:
+                        await cursor.execute(SQL_LOGIN, (username,))
+                        return len(await cursor.fetchall()) > 0
+            except Exception:
+                return None
+        
+        loop = asyncio.get_running_loop()
+        results = {}
+        try:
+            for concurrent_count, usernames in waves:
+                self.logger.info(f"执行{concurrent_count}并发登录测试（asyncio）...")
+                
+                start_time = loop.time()
+                outcomes = await asyncio.wait_for(
+                    asyncio.gather(*(async_login(username) for username in usernames)), timeout)
+                total_time = loop.time() - start_time
+                
+                errors = sum(1 for outcome in outcomes if outcome is None)
+                results[f'{concurrent_count}_concurrent'] = \
+                    self._concurrent_stats(concurrent_count, total_time, errors)
+        finally:
+            pool.close()
+            await pool.wait_closed()
+        
+        return results
+    
     def test_permission_query(self) -> Dict[str, Any]:
         """测试权限查询性能"""
         self.logger.info("开始权限查询性能测试...")
@@ -241,33 +640,39 @@ class PerformanceTest:
         self.logger.info("执行单用户权限查询测试...")
         single_times = []
         
-        for _ in tqdm(range(config['single_query_tests']), desc="单用户权限查询"):
-            user = random.choice(self.test_users)
+        user_ids = self._user_ids.tolist()
+        permission_sql = SQL_MV_USER_PERMISSIONS if self.use_mv else SQL_USER_PERMISSIONS
+        results['materialized_view'] = self.use_mv
+        
+        perf_counter_ns = time.perf_counter_ns
+        with self.db_manager.get_cursor() as cursor:
+            for i in self._progress(self._random_user_indexes(config['single_query_tests']), desc="单用户权限查询"):
+                start_ns = perf_counter_ns()
+                cursor.execute(permission_sql, (user_ids[i],))
+                cursor.fetchall()
+                single_times.append(perf_counter_ns() - start_ns)
+        
+        results['single_query'] = self._summarize(single_times)
+        
+        # 带缓存的单用户权限查询测试（首次查询落库，之后命中进程内LRU缓存）
+        if self.use_cache:
+            self.logger.info("执行带缓存的单用户权限查询测试...")
+            cached_times = []
+            _cached_permissions.cache_clear()
             
-            def single_permission_query():
-                sql = """
-                SELECT DISTINCT p.permission_code
-                FROM users u
-                JOIN user_roles ur ON u.id = ur.user_id AND ur.status = 1
-                JOIN roles r ON ur.role_id = r.id AND r.status = 1
-                JOIN role_permissions rp ON r.id = rp.role_id AND rp.status = 1
-                JOIN permissions p ON rp.permission_id = p.id
-                WHERE u.id = %s AND u.status = 1
-                """
-                return self.db_manager.execute_query(sql, (user['id'],))
+            db_manager = self.db_manager
+            for i in self._progress(self._random_user_indexes(config['single_query_tests']), desc="缓存权限查询"):
+                start_ns = perf_counter_ns()
+                _cached_permissions(db_manager, permission_sql, user_ids[i])
+                cached_times.append(perf_counter_ns() - start_ns)
             
-            _, exec_time = self._measure_time(single_permission_query)
-            single_times.append(exec_time)
-        
-        results['single_query'] = {
-            'count': len(single_times),
-            'avg_time': statistics.mean(single_times),
-            'min_time': min(single_times),
-            'max_time': max(single_times),
-            'median_time': statistics.median(single_times),
-            'p95_time': self._percentile(single_times, 95),
-            'p99_time': self._percentile(single_times, 99)
-        }
+            cache_info = _cached_permissions.cache_info()
+            results['single_query_cached'] = self._summarize(cached_times)
+            results['single_query_cached'].update({
+                'cache_hits': cache_info.hits,
+                'cache_misses': cache_info.misses,
+                'hit_rate': cache_info.hits / len(cached_times)
+            })
         
         # 批量权限查询测试
         for batch_size in config['batch_query_sizes']:
@@ -275,33 +680,23 @@ class PerformanceTest:
             
             batch_times = []
             
-            for _ in range(10):  # 执行10次批量测试
-                user_ids = [random.choice(self.test_users)['id'] for _ in range(batch_size)]
-                
-                def batch_permission_query():
-                    placeholders = ','.join(['%s'] * len(user_ids))
-                    sql = f"""
-                    SELECT u.id as user_id, p.permission_code
-                    FROM users u
-                    JOIN user_roles ur ON u.id = ur.user_id AND ur.status = 1
-                    JOIN roles r ON ur.role_id = r.id AND r.status = 1
-                    JOIN role_permissions rp ON r.id = rp.role_id AND rp.status = 1
-                    JOIN permissions p ON rp.permission_id = p.id
-                    WHERE u.id IN ({placeholders}) AND u.status = 1
-                    """
-                    return self.db_manager.execute_query(sql, user_ids)
-                
-                _, exec_time = self._measure_time(batch_permission_query)
-                batch_times.append(exec_time)
+            batch_template = SQL_MV_BATCH_USER_PERMISSIONS if self.use_mv else SQL_BATCH_USER_PERMISSIONS
+            batch_sql = batch_template.format(placeholders=','.join(['%s'] * batch_size))
+            
+            with self.db_manager.get_cursor() as cursor:
+                for _ in range(10):  # 执行10次批量测试
+                    batch_user_ids = self._user_ids[self._rng.integers(0, len(self._user_ids), size=batch_size)].tolist()
+                    start_ns = perf_counter_ns()
+                    cursor.execute(batch_sql, batch_user_ids)
+                    cursor.fetchall()
+                    batch_times.append(perf_counter_ns() - start_ns)
             
-            results['batch_query'][f'batch_{batch_size}'] = {
+            summary = self._summarize(batch_times)
+            summary.update({
                 'batch_size': batch_size,
-                'count': len(batch_times),
-                'avg_time': statistics.mean(batch_times),
-                'avg_time_per_user': statistics.mean(batch_times) / batch_size,
-                'min_time': min(batch_times),
-                'max_time': max(batch_times)
-            }
+                'avg_time_per_user': summary['avg_time'] / batch_size
+            })
+            results['batch_query'][f'batch_{batch_size}'] = summary
         
         self.results['permission_query'] = results
         return results
@@ -326,102 +721,94 @@ class PerformanceTest:
             'delete': []
         }
 
-        for _ in tqdm(range(config['crud_test_count']), desc="用户CRUD测试"):
-            # 创建用户
-            def create_user():
-                sql = """
-                INSERT INTO users (username, email, password_hash, status)
-                VALUES (%s, %s, %s, %s)
-                """
-                username = f"test_user_{random.randint(100000, 999999)}"
-                email = f"{username}@test.com"
-                password_hash = "$2b$12$test_hash_placeholder"
-                return self.db_manager.execute_update(sql, (username, email, password_hash, 1))
-
-            _, create_time = self._measure_time(create_user)
-            crud_times['create'].append(create_time)
-
-            # 读取用户
-            def read_user():
-                sql = "SELECT * FROM users WHERE status = 1 ORDER BY RAND() LIMIT 1"
-                return self.db_manager.execute_query(sql)
-
-            _, read_time = self._measure_time(read_user)
-            crud_times['read'].append(read_time)
-
-            # 更新用户
-            def update_user():
-                user = random.choice(self.test_users)
-                sql = "UPDATE users SET updated_at = NOW() WHERE id = %s"
-                return self.db_manager.execute_update(sql, (user['id'],))
-
-            _, update_time = self._measure_time(update_user)
-            crud_times['update'].append(update_time)
+        user_ids = self._user_ids.tolist()
+        read_indexes = self._random_user_indexes(config['crud_test_count'])
+        update_indexes = self._random_user_indexes(config['crud_test_count'])
+
+        # 每 transaction_size 次CRUD操作放在同一事务中提交，分摊每次提交的redo log刷盘开销
+        crud_count = config['crud_test_count']
+        transaction_size = config['crud_transaction_size']
+        transaction_times = []
+        username_suffixes = self._rng.integers(100000, 1000000, size=crud_count).tolist()
+
+        perf_counter_ns = time.perf_counter_ns
+        create_times, read_times, update_times = crud_times['create'], crud_times['read'], crud_times['update']
+
+        with self._progress(total=crud_count, desc="用户CRUD测试") as pbar:
+            for start in range(0, crud_count, transaction_size):
+                chunk = range(start, min(start + transaction_size, crud_count))
+                transaction_start = perf_counter_ns()
+
+                with self.db_manager.transaction() as conn, self.db_manager.get_cursor(conn) as cursor:
+                    for n in chunk:
+                        # 创建用户
+                        username = f"test_user_{username_suffixes[n]}"
+                        params = (username, f"{username}@test.com", "$2b$12$test_hash_placeholder", 1)
+                        start_ns = perf_counter_ns()
+                        cursor.execute(SQL_CREATE_USER, params)
+                        create_times.append(perf_counter_ns() - start_ns)
+
+                        # 读取用户
+                        start_ns = perf_counter_ns()
+                        cursor.execute(SQL_READ_USER, (user_ids[read_indexes[n]],))
+                        cursor.fetchall()
+                        read_times.append(perf_counter_ns() - start_ns)
+
+                        # 更新用户
+                        start_ns = perf_counter_ns()
+                        cursor.execute(SQL_UPDATE_USER, (user_ids[update_indexes[n]],))
+                        update_times.append(perf_counter_ns() - start_ns)
+
+                # 事务耗时包含提交
+                transaction_times.append(perf_counter_ns() - transaction_start)
+                pbar.update(len(chunk))
 
         for operation, times in crud_times.items():
             if times:
-                results['user_crud'][operation] = {
-                    'count': len(times),
-                    'avg_time': statistics.mean(times),
-                    'min_time': min(times),
-                    'max_time': max(times),
-                    'median_time': statistics.median(times)
-                }
+                results['user_crud'][operation] = self._summarize(times)
+
+        if transaction_times:
+            summary = self._summarize(transaction_times)
+            summary.update({
+                'operations_per_transaction': transaction_size * 3,
+                'avg_time_per_operation': summary['avg_time'] * summary['count'] / (crud_count * 3)
+            })
+            results['user_crud']['transaction'] = summary
 
         # 角色分配性能测试
         self.logger.info("执行角色分配性能测试...")
         assignment_times = []
 
-        for _ in tqdm(range(100), desc="角色分配测试"):
-            user = random.choice(self.test_users)
-            role = random.choice(self.test_roles)
-
-            def assign_role():
-                sql = """
-                INSERT IGNORE INTO user_roles (user_id, role_id, assigned_by, status)
-                VALUES (%s, %s, %s, %s)
-                """
-                assigned_by = random.choice(self.test_users)['id']
-                return self.db_manager.execute_update(sql, (user['id'], role['id'], assigned_by, 1))
-
-            _, exec_time = self._measure_time(assign_role)
-            assignment_times.append(exec_time)
-
-        results['role_assignment'] = {
-            'count': len(assignment_times),
-            'avg_time': statistics.mean(assignment_times),
-            'min_time': min(assignment_times),
-            'max_time': max(assignment_times),
-            'median_time': statistics.median(assignment_times)
-        }
+        assignment_count = 100
+        assign_users = self._random_user_indexes(assignment_count)
+        assign_by = self._random_user_indexes(assignment_count)
+        assign_roles = self._role_ids[self._rng.integers(0, len(self._role_ids), size=assignment_count)].tolist()
+
+        for n in self._progress(range(assignment_count), desc="角色分配测试"):
+            params = (user_ids[assign_users[n]], assign_roles[n], user_ids[assign_by[n]], 1)
+            start_ns = perf_counter_ns()
+            self.db_manager.execute_update(SQL_ASSIGN_ROLE, params)
+            assignment_times.append(perf_counter_ns() - start_ns)
+
+        results['role_assignment'] = self._summarize(assignment_times)
 
         # 批量操作测试
         for batch_size in config['batch_sizes']:
             self.logger.info(f"执行批量操作测试 (批量大小: {batch_size})...")
 
             def batch_insert():
-                sql = """
-                INSERT INTO audit_logs (user_id, action_type, resource_type, resource_id,
-                                      action_result, ip_address, user_agent)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """
-
-                batch_data = []
-                for _ in range(batch_size):
-                    user = random.choice(self.test_users)
-                    batch_data.append((
-                        user['id'],
-                        'test_action',
-                        'test_resource',
-                        str(random.randint(1, 1000)),
-                        1,
-                        '127.0.0.1',
-                        'Test Agent'
-                    ))
-
-                return self.db_manager.execute_batch(sql, batch_data)
-
-            _, batch_time = self._measure_time(batch_insert)
+                batch_user_ids = self._user_ids[self._rng.integers(0, len(self._user_ids), size=batch_size)].tolist()
+                resource_ids = self._rng.integers(1, 1001, size=batch_size).astype(str).tolist()
+                batch_data = [
+                    (user_id, 'test_action', 'test_resource', resource_id, 1, '127.0.0.1', 'Test Agent')
+                    for user_id, resource_id in zip(batch_user_ids, resource_ids)
+                ]
+
+                return self._multi_values_insert(SQL_INSERT_AUDIT_LOGS_PREFIX, AUDIT_LOG_ROW_PLACEHOLDER,
+                                                 batch_data)
+
+            _, batch_ns = self._measure_time(batch_insert)
+            batch_time = batch_ns * 1e-9
 
             results['batch_operations'][f'batch_{batch_size}'] = {
                 'batch_size': batch_size,
@@ -442,6 +829,7 @@ class PerformanceTest:
             'duration_minutes': config['duration_minutes'],
             'concurrent_users': config['concurrent_users'],
             'operations_per_minute': config['operations_per_minute'],
+            'via_proxysql': self.config.VIA_PROXYSQL,
             'total_operations': 0,
             'successful_operations': 0,
             'failed_operations': 0,
@@ -455,102 +843,100 @@ class PerformanceTest:
         duration_seconds = config['duration_minutes'] * 60
         total_operations = config['operations_per_minute'] * config['duration_minutes']
 
-        operation_times = []
-        successful_ops = 0
-        failed_ops = 0
+        stress_login_sqls = self._stress_login_sqls
+        user_ids = self._user_ids.tolist()
+        count_permissions_sql = SQL_MV_COUNT_PERMISSIONS if self.use_mv else SQL_COUNT_PERMISSIONS
 
-        def stress_operation():
-            """压力测试操作"""
+        def stress_operation(operation_type: int, user_index: int):
+            """压力测试操作（操作类型和用户下标由提交方预先生成）"""
             try:
-                # 随机选择操作类型
-                operation_type = random.choice(['login', 'permission_check', 'user_query'])
-
-                if operation_type == 'login':
-                    user = random.choice(self.test_users)
-                    sql = "SELECT id FROM users WHERE username = %s AND status = 1"
-                    result = self.db_manager.execute_query(sql, (user['username'],))
+                if operation_type == 0:  # login
+                    result = self.db_manager.execute_query(stress_login_sqls[user_index])
                     return len(result) > 0 if result else False
 
-                elif operation_type == 'permission_check':
-                    user = random.choice(self.test_users)
-                    sql = """
-                    SELECT COUNT(*) as perm_count
-                    FROM users u
-                    JOIN user_roles ur ON u.id = ur.user_id AND ur.status = 1
-                    JOIN role_permissions rp ON ur.role_id = rp.role_id AND rp.status = 1
-                    WHERE u.id = %s
-                    """
-                    result = self.db_manager.execute_query(sql, (user['id'],))
+                elif operation_type == 1:  # permission_check
+                    result = self.db_manager.execute_query(count_permissions_sql, (user_ids[user_index],))
                     return result[0]['perm_count'] > 0 if result else False
 
                 else:  # user_query
-                    sql = "SELECT COUNT(*) as user_count FROM users WHERE status = 1"
-                    result = self.db_manager.execute_query(sql)
+                    result = self.db_manager.execute_query(SQL_COUNT_USERS)
                     return result[0]['user_count'] > 0 if result else False
 
             except Exception:
                 return False
 
-        self.logger.info(f"开始{config['duration_minutes']}分钟压力测试，{config['concurrent_users']}并发用户...")
-
-        start_time = time.time()
-        end_time = start_time + duration_seconds
+        # 每个工作线程把耗时和成败写入自己的缓冲区，结束后一次合并，记录结果时无需加锁
+        thread_buffers = threading.local()
+        all_buffers = []
+        buffers_lock = threading.Lock()
+        perf_counter_ns = time.perf_counter_ns
+
+        def timed_operation(operation_type: int, user_index: int):
+            buffers = getattr(thread_buffers, 'buffers', None)
+            if buffers is None:
+                buffers = thread_buffers.buffers = (array('q'), array('b'))
+                with buffers_lock:
+                    all_buffers.append(buffers)
+            start_ns = perf_counter_ns()
+            success = stress_operation(operation_type, user_index)
+            buffers[0].append(perf_counter_ns() - start_ns)
+            buffers[1].append(1 if success else 0)
 
-        with ThreadPoolExecutor(max_workers=config['concurrent_users']) as executor:
-            with tqdm(total=total_operations, desc="压力测试") as pbar:
-
-                while time.time() < end_time and len(operation_times) < total_operations:
-                    # 提交一批操作
-                    batch_size = min(config['concurrent_users'], total_operations - len(operation_times))
-                    futures = []
-
-                    for _ in range(batch_size):
-                        future = executor.submit(self._measure_time, stress_operation)
-                        futures.append(future)
-
-                    # 收集结果
-                    for future in as_completed(futures, timeout=30):
-                        try:
-                            result, exec_time = future.result()
-                            operation_times.append(exec_time)
-
-                            if result:
-                                successful_ops += 1
-                            else:
-                                failed_ops += 1
+        self.logger.info(f"开始{config['duration_minutes']}分钟压力测试，{config['concurrent_users']}并发用户...")
 
-                            pbar.update(1)
+        workers = self._worker_count(config['concurrent_users'])
+        # 在途操作数由信号量限制，操作完成即补位，不再按批等待最慢的一个
+        in_flight = threading.BoundedSemaphore(workers)
 
-                        except Exception:
-                            failed_ops += 1
-                            pbar.update(1)
+        def release_slot(future):
+            in_flight.release()
 
-        actual_duration = time.time() - start_time
+        start_time = time.perf_counter()
+        end_time = start_time + duration_seconds
 
-        if operation_times:
+        with self._progress(total=total_operations, desc="压力测试") as pbar:
+            executor = self._executor
+            submitted = 0
+            while time.perf_counter() < end_time and submitted < total_operations:
+                # 随机选择操作类型和用户（每轮预先生成一批）
+                batch_size = min(workers, total_operations - submitted)
+                operation_types = self._rng.integers(0, 3, size=batch_size).tolist()
+                user_indexes = self._random_user_indexes(batch_size)
+
+                for operation_type, user_index in zip(operation_types, user_indexes):
+                    in_flight.acquire()
+                    executor.submit(timed_operation, operation_type, user_index).add_done_callback(release_slot)
+                submitted += batch_size
+                pbar.update(batch_size)
+
+            # 等待在途操作全部完成
+            for _ in range(workers):
+                in_flight.acquire()
+
+        actual_duration = time.perf_counter() - start_time
+
+        if all_buffers:
+            operation_times = np.concatenate([np.frombuffer(times, dtype=np.int64) for times, _ in all_buffers])
+            successful_ops = int(sum(np.frombuffer(outcomes, dtype=np.int8).sum() for _, outcomes in all_buffers))
+            failed_ops = operation_times.size - successful_ops
+            summary = self._summarize(operation_times)
             results.update({
-                'total_operations': len(operation_times),
+                'total_operations': int(operation_times.size),
                 'successful_operations': successful_ops,
                 'failed_operations': failed_ops,
-                'avg_response_time': statistics.mean(operation_times),
-                'max_response_time': max(operation_times),
-                'min_response_time': min(operation_times),
-                'operations_per_second': len(operation_times) / actual_duration,
-                'error_rate': failed_ops / len(operation_times),
+                'avg_response_time': summary['avg_time'],
+                'max_response_time': summary['max_time'],
+                'min_response_time': summary['min_time'],
+                'p95_response_time': summary['p95_time'],
+                'p99_response_time': summary['p99_time'],
+                'operations_per_second': operation_times.size / actual_duration,
+                'error_rate': failed_ops / operation_times.size,
                 'actual_duration_seconds': actual_duration
             })
 
         self.results['stress_test'] = results
         return results
 
-    def _percentile(self, data: List[float], percentile: int) -> float:
-        """计算百分位数"""
-        if not data:
-            return 0.0
-        sorted_data = sorted(data)
-        index = int(len(sorted_data) * percentile / 100)
-        return sorted_data[min(index, len(sorted_data) - 1)]
-
     def run_all_tests(self) -> Dict[str, Any]:
         """运行所有性能测试"""
         self.logger.info("开始运行所有性能测试...")
@@ -614,6 +1000,9 @@ class PerformanceTest:
                 print(f"🔍 权限查询测试:")
                 print(f"  单次查询平均时间: {single['avg_time']*1000:.2f}ms")
                 print(f"  P95响应时间: {single['p95_time']*1000:.2f}ms")
+            if 'single_query_cached' in perm:
+                cached = perm['single_query_cached']
+                print(f"  缓存查询平均时间: {cached['avg_time']*1000:.2f}ms (命中率 {cached['hit_rate']*100:.1f}%)")
 
         # 压力测试结果
         if 'stress_test' in self.results and self.results['stress_test']:
@@ -627,7 +1016,8 @@ class PerformanceTest:
         print("="*60)
 
     def close(self):
-        """关闭数据库连接"""
+        """关闭线程池和数据库连接"""
+        self._executor.shutdown(wait=True)
         if self.db_manager:
             self.db_manager.close()
 
@@ -640,10 +1030,16 @@ def main():
     parser.add_argument('--env', default='development', help='配置环境')
     parser.add_argument('--test', choices=['auth', 'permission', 'data', 'stress', 'all'],
                        default='all', help='测试类型')
+    parser.add_argument('--no-cache', action='store_true', help='不测量权限缓存命中时的查询性能')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                       help='并发登录测试改用 asyncio + aiomysql（需安装 aiomysql）')
+    parser.add_argument('--use-mv', action='store_true',
+                       help='权限查询改查预先展开的 user_permissions_mv 物化表')
 
     args = parser.parse_args()
 
-    tester = PerformanceTest(args.env)
+    tester = PerformanceTest(args.env, use_cache=not args.no_cache, use_async=args.use_async,
+                             use_mv=args.use_mv)
 
     try:
         if args.test == 'all':
@@ -665,8 +1061,7 @@ def main():
         output_file = f"reports/performance_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         os.makedirs('reports', exist_ok=True)
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False, default=str)
+        _dump_results(results, output_file)
 
         print(f"\n📄 详细测试结果已保存到: {output_file}")
 
@@ -11,23 +11,323 @@ RBAC权限系统测试报告生成器
 import sys
 import os
 import json
+import shutil
+import hashlib
+import numbers
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 import logging
+from types import MappingProxyType, SimpleNamespace
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from jinja2 import Template, Environment, FileSystemLoader
+    import orjson  # 可选依赖，存在时用于快速写出JSON报告
 except ImportError:
-    print("缺少依赖包: jinja2")
-    print("请运行: pip install jinja2")
-    sys.exit(1)
+    orjson = None
+
+try:
+    import ujson  # 可选依赖，未安装orjson时的后备
+except ImportError:
+    ujson = None
 
 from config.test_config import get_config
 
 
+# 项目根目录，模板和模板字节码缓存目录都相对于它解析
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# HTML报告模板文件
+HTML_TEMPLATE_NAME = 'report.html.j2'
+
+# HTML报告样式表，所有报告共用输出目录下的同一份
+REPORT_CSS_NAME = 'report.css'
+
+
+# 性能分析基准值
+_BENCHMARKS = MappingProxyType({
+    'login_response_time': 0.5,      # 500ms
+    'permission_query_time': 0.05,   # 50ms
+    'operations_per_second': 1000,
+    'error_rate_threshold': 0.01     # 1%
+})
+
+# 性能瓶颈及对应的优化建议
+_RECOMMENDATIONS = MappingProxyType({
+    '用户认证性能': '优化用户认证查询，考虑添加用户名索引或使用缓存',
+    '权限查询性能': '优化权限查询SQL，考虑创建复合索引或使用权限缓存',
+    '系统吞吐量': '增加数据库连接池大小，考虑读写分离或分库分表',
+    '系统稳定性': '检查错误日志，优化异常处理和重试机制'
+})
+
+# 数据生成统计中需要展示的记录数字段
+DATA_GENERATION_COUNT_KEYS = (
+    'users_generated', 'roles_generated', 'permissions_generated',
+    'user_roles_generated', 'role_permissions_generated', 'audit_logs_generated'
+)
+
+
+def _materialize_view(node: Any) -> Any:
+    """
+    把结果树转换为可直接渲染的视图，保留原始值并补充格式化好的展示字段
+
+    - xxx_time: 生成 xxx_ms，毫秒，保留两位小数
+    - xxx_rate: 生成 xxx_rate_pct，百分比，保留两位小数
+    - 其他整数: 生成 xxx_fmt，千分位分隔
+    - 其他浮点数: 生成 xxx_fmt，保留两位小数
+
+    Args:
+        node: 测试结果或其子树
+
+    Returns:
+        Any: 展示视图，非字典节点原样返回
+    """
+    if not isinstance(node, dict):
+        return node
+
+    view = {}
+    for key, value in node.items():
+        view[key] = _materialize_view(value)
+        if isinstance(value, bool) or not isinstance(value, numbers.Real):
+            continue
+        if key.endswith('_time'):
+            view[f'{key[:-5]}_ms'] = f'{value * 1000:.2f}'
+        elif key.endswith('_rate'):
+            view[f'{key}_pct'] = f'{value * 100:.2f}'
+        elif isinstance(value, numbers.Integral):
+            view[f'{key}_fmt'] = f'{value:,}'
+        else:
+            view[f'{key}_fmt'] = f'{value:.2f}'
+    return view
+
+
+@lru_cache(maxsize=128)
+def _calc_duration_cached(start: str, end: str) -> str:
+    """
+    计算两个ISO时间字符串之间的间隔并格式化
+
+    Args:
+        start: 开始时间
+        end: 结束时间
+
+    Returns:
+        str: 格式化后的时间间隔，解析失败时返回"计算失败"
+    """
+    try:
+        # 只有以Z结尾的UTC时间才需要改写时区后缀
+        if start[-1] == 'Z':
+            start = start[:-1] + '+00:00'
+        if end[-1] == 'Z':
+            end = end[:-1] + '+00:00'
+        duration = datetime.fromisoformat(end) - datetime.fromisoformat(start)
+
+        total_seconds = duration.total_seconds()
+        secs = int(total_seconds)
+        hours, remainder = divmod(secs, 3600)
+        minutes, seconds = divmod(remainder, 60)
+
+        if hours > 0:
+            return f"{hours}小时{minutes}分钟{seconds}秒"
+        elif minutes > 0:
+            return f"{minutes}分钟{seconds}秒"
+        else:
+            return f"{total_seconds:.2f}秒"
+
+    except Exception:
+        return "计算失败"
+
+
+def _success_rate_class(success_rate: float) -> str:
+    """根据成功率返回状态样式类"""
+    if success_rate >= 0.95:
+        return 'status-success'
+    if success_rate >= 0.9:
+        return 'status-warning'
+    return 'status-danger'
+
+
+def _normalize(test_results: Dict[str, Any]) -> SimpleNamespace:
+    """
+    把测试结果整理为各测试段都有默认值的视图，缺失或为空的段统一为空字典
+
+    Args:
+        test_results: 性能测试结果
+
+    Returns:
+        SimpleNamespace: auth、perm、data_ops、stress 以及 single_login、single_query
+    """
+    auth = test_results.get('authentication') or {}
+    perm = test_results.get('permission_query') or {}
+    return SimpleNamespace(
+        auth=auth,
+        perm=perm,
+        data_ops=test_results.get('data_operations') or {},
+        stress=test_results.get('stress_test') or {},
+        single_login=auth.get('single_login') or {},
+        single_query=perm.get('single_query') or {}
+    )
+
+
+def _content_digest(test_results: Dict[str, Any], data_generation_stats: Dict[str, Any] = None) -> str:
+    """
+    计算报告内容摘要，用于报告文件命名
+
+    Args:
+        test_results: 性能测试结果
+        data_generation_stats: 数据生成统计
+
+    Returns:
+        str: 16位十六进制摘要
+    """
+    content = {'test_results': test_results, 'data_generation_stats': data_generation_stats}
+    if orjson is not None:
+        payload = orjson.dumps(content, default=str,
+                               option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        payload = json.dumps(content, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+@contextmanager
+def _atomic_output(path: str):
+    """
+    原子写出文件：先写入同目录下的临时文件，成功后再替换为目标文件
+
+    报告按内容摘要命名且已存在时直接复用，写到一半失败留下的残缺文件
+    会被一直复用，因此失败时删除临时文件，目标路径上只会出现完整的报告。
+
+    Args:
+        path: 目标文件路径
+
+    Yields:
+        str: 临时文件路径
+    """
+    # 临时文件由写入方正常创建，权限与直接写目标文件时一致
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _load_json(path: str) -> Any:
+    """
+    读取JSON文件，安装了orjson时整块读入字节直接解析，否则回退到标准库json
+
+    Args:
+        path: JSON文件路径
+
+    Returns:
+        Any: 解析结果
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dump_json(obj: Any, path: str):
+    """
+    将对象写入JSON文件，按orjson、ujson、标准库json的顺序选用可用的实现
+
+    Args:
+        obj: 要写出的对象
+        path: 输出文件路径
+    """
+    if orjson is not None:
+        # orjson直接输出UTF-8字节，以二进制方式写入
+        with open(path, 'wb') as f:
+            # datetime也交给default=str处理，与ujson和标准库json的输出一致
+            f.write(orjson.dumps(obj, default=str,
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS |
+                                 orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME))
+    elif ujson is not None:
+        with open(path, 'w', encoding='utf-8') as f:
+            ujson.dump(obj, f, indent=2, ensure_ascii=False, default=str)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False, default=str)
+
+
+def _error_rate_class(error_rate: float) -> str:
+    """根据错误率返回指标卡片样式类"""
+    if error_rate <= 0.01:
+        return ''
+    if error_rate <= 0.05:
+        return 'warning'
+    return 'danger'
+
+
+def _render_stress_block(s: Dict[str, Any]) -> str:
+    """生成压力测试指标卡片"""
+    return f'''<div class="metrics-grid">
+    <div class="metric-card"><div class="metric-title">测试时长</div><div class="metric-value">{s["duration_minutes"]}</div><div class="metric-unit">分钟</div></div>
+    <div class="metric-card"><div class="metric-title">并发用户数</div><div class="metric-value">{s["concurrent_users"]}</div><div class="metric-unit">用户</div></div>
+    <div class="metric-card"><div class="metric-title">总操作数</div><div class="metric-value">{s["total_operations"]:,}</div><div class="metric-unit">次</div></div>
+    <div class="metric-card"><div class="metric-title">成功操作数</div><div class="metric-value">{s["successful_operations"]:,}</div><div class="metric-unit">次</div></div>
+    <div class="metric-card {_error_rate_class(s["error_rate"])}"><div class="metric-title">错误率</div><div class="metric-value">{s["error_rate"] * 100:.2f}</div><div class="metric-unit">%</div></div>
+    <div class="metric-card"><div class="metric-title">每秒操作数</div><div class="metric-value">{s["operations_per_second"]:.2f}</div><div class="metric-unit">ops/s</div></div>
+    <div class="metric-card"><div class="metric-title">平均响应时间</div><div class="metric-value">{s["avg_response_time"] * 1000:.2f}</div><div class="metric-unit">毫秒</div></div>
+    <div class="metric-card"><div class="metric-title">最大响应时间</div><div class="metric-value">{s["max_response_time"] * 1000:.2f}</div><div class="metric-unit">毫秒</div></div>
+</div>'''
+
+
+def _render_concurrent_login_rows(results: Dict[str, Any]) -> str:
+    """生成并发登录测试表格行"""
+    return '\n'.join(
+        f'<tr><td>{r["concurrent_users"]}</td>'
+        f'<td>{r["total_time"]:.2f}</td>'
+        f'<td>{r["avg_time_per_request"] * 1000:.2f}</td>'
+        f'<td>{r["requests_per_second"]:.2f}</td>'
+        f'<td class="{_success_rate_class(r["success_rate"])}">{r["success_rate"] * 100:.1f}%</td></tr>'
+        for r in results.values()
+    )
+
+
+def _render_batch_query_rows(results: Dict[str, Any]) -> str:
+    """生成批量权限查询表格行"""
+    return '\n'.join(
+        f'<tr><td>{r["batch_size"]}</td>'
+        f'<td>{r["avg_time"] * 1000:.2f}</td>'
+        f'<td>{r["avg_time_per_user"] * 1000:.2f}</td>'
+        f'<td>{r["min_time"] * 1000:.2f}</td>'
+        f'<td>{r["max_time"] * 1000:.2f}</td></tr>'
+        for r in results.values()
+    )
+
+
+def _render_user_crud_rows(results: Dict[str, Any]) -> str:
+    """生成用户CRUD操作表格行"""
+    return '\n'.join(
+        f'<tr><td>{operation.upper()}</td>'
+        f'<td>{r["count"]}</td>'
+        f'<td>{r["avg_time"] * 1000:.2f}</td>'
+        f'<td>{r["min_time"] * 1000:.2f}</td>'
+        f'<td>{r["max_time"] * 1000:.2f}</td></tr>'
+        for operation, r in results.items()
+    )
+
+
+def _render_batch_operation_rows(results: Dict[str, Any]) -> str:
+    """生成批量操作性能表格行"""
+    return '\n'.join(
+        f'<tr><td>{r["batch_size"]}</td>'
+        f'<td>{r["total_time"]:.3f}</td>'
+        f'<td>{r["time_per_record"] * 1000:.2f}</td>'
+        f'<td>{r["records_per_second"]:.0f}</td></tr>'
+        for r in results.values()
+    )
+
+
 class ReportGenerator:
     """测试报告生成器"""
     
@@ -48,460 +348,79 @@ class ReportGenerator:
         self.output_dir = self.config.REPORT['output_dir']
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # 样式表只在输出目录中缺失时复制一次，报告通过<link>引用
+        css_path = os.path.join(self.output_dir, REPORT_CSS_NAME)
+        if not os.path.exists(css_path):
+            shutil.copyfile(os.path.join(PROJECT_ROOT, self.config.REPORT['static_dir'], REPORT_CSS_NAME), css_path)
+        
+        # 模板环境和HTML模板在首次生成HTML报告时创建，只生成JSON报告时无需jinja2
+        self.env = None
+        self._html_template = None
+        
         self.logger.info("报告生成器初始化完成")
     
-    def generate_html_report(self, test_results: Dict[str, Any], 
-                           data_generation_stats: Dict[str, Any] = None) -> str:
+    def _get_html_template(self):
+        """
+        获取编译后的HTML模板，首次调用时导入jinja2并编译
+        
+        Returns:
+            jinja2.Template: HTML报告模板
+        """
+        if self._html_template is None:
+            try:
+                from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+            except ImportError:
+                raise ImportError("生成HTML报告需要jinja2，请运行: pip install jinja2")
+            
+            # 模板环境：从模板目录加载，编译结果写入字节码缓存，后续运行跳过解析和编译
+            template_dir = os.path.join(PROJECT_ROOT, self.config.REPORT['template_dir'])
+            cache_dir = os.path.join(PROJECT_ROOT, '.jinja_cache')
+            os.makedirs(cache_dir, exist_ok=True)
+            self.env = Environment(
+                loader=FileSystemLoader(template_dir),
+                bytecode_cache=FileSystemBytecodeCache(directory=cache_dir),
+                auto_reload=False,
+                trim_blocks=True,
+                lstrip_blocks=True
+            )
+            self._html_template = self.env.get_template(HTML_TEMPLATE_NAME)
+        return self._html_template
+    
+    def generate_html_report(self, test_results: Dict[str, Any],
+                           data_generation_stats: Dict[str, Any] = None,
+                           now: datetime = None) -> str:
         """
         生成HTML格式的测试报告
         
         Args:
             test_results: 性能测试结果
             data_generation_stats: 数据生成统计
+            now: 报告生成时间，未指定时取当前时间
             
         Returns:
             str: 生成的HTML文件路径
         """
         self.logger.info("生成HTML测试报告...")
+        now = now or datetime.now()
         
-        # HTML模板
-        html_template = """
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>RBAC权限系统测试报告</title>
-    <style>
-        body {
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: white;
-            padding: 30px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        .header {
-            text-align: center;
-            border-bottom: 2px solid #007bff;
-            padding-bottom: 20px;
-            margin-bottom: 30px;
-        }
-        .header h1 {
-            color: #007bff;
-            margin: 0;
-        }
-        .header .subtitle {
-            color: #666;
-            margin-top: 10px;
-        }
-        .section {
-            margin-bottom: 40px;
-        }
-        .section h2 {
-            color: #333;
-            border-left: 4px solid #007bff;
-            padding-left: 15px;
-            margin-bottom: 20px;
-        }
-        .metrics-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 20px;
-        }
-        .metric-card {
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 6px;
-            border-left: 4px solid #28a745;
-        }
-        .metric-card.warning {
-            border-left-color: #ffc107;
-        }
-        .metric-card.danger {
-            border-left-color: #dc3545;
-        }
-        .metric-title {
-            font-weight: bold;
-            color: #333;
-            margin-bottom: 10px;
-        }
-        .metric-value {
-            font-size: 24px;
-            font-weight: bold;
-            color: #007bff;
-        }
-        .metric-unit {
-            font-size: 14px;
-            color: #666;
-        }
-        .table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }
-        .table th, .table td {
-            padding: 12px;
-            text-align: left;
-            border-bottom: 1px solid #ddd;
-        }
-        .table th {
-            background-color: #f8f9fa;
-            font-weight: bold;
-            color: #333;
-        }
-        .table tr:hover {
-            background-color: #f5f5f5;
-        }
-        .status-success {
-            color: #28a745;
-            font-weight: bold;
-        }
-        .status-warning {
-            color: #ffc107;
-            font-weight: bold;
-        }
-        .status-danger {
-            color: #dc3545;
-            font-weight: bold;
-        }
-        .footer {
-            text-align: center;
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 1px solid #ddd;
-            color: #666;
-        }
-        .chart-placeholder {
-            height: 300px;
-            background: #f8f9fa;
-            border: 2px dashed #ddd;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: #666;
-            margin: 20px 0;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>RBAC权限系统测试报告</h1>
-            <div class="subtitle">
-                生成时间: {{ report_time }}<br>
-                测试环境: {{ test_env }}
-            </div>
-        </div>
-
-        <!-- 测试概览 -->
-        <div class="section">
-            <h2>📊 测试概览</h2>
-            <div class="metrics-grid">
-                <div class="metric-card">
-                    <div class="metric-title">测试开始时间</div>
-                    <div class="metric-value">{{ test_results.start_time or '未知' }}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">测试结束时间</div>
-                    <div class="metric-value">{{ test_results.end_time or '未知' }}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">总测试时长</div>
-                    <div class="metric-value">{{ test_duration }}</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">测试状态</div>
-                    <div class="metric-value status-success">完成</div>
-                </div>
-            </div>
-        </div>
-
-        {% if data_generation_stats %}
-        <!-- 数据生成统计 -->
-        <div class="section">
-            <h2>🗄️ 测试数据生成统计</h2>
-            <div class="metrics-grid">
-                <div class="metric-card">
-                    <div class="metric-title">用户数据</div>
-                    <div class="metric-value">{{ "{:,}".format(data_generation_stats.users_generated or 0) }}</div>
-                    <div class="metric-unit">条记录</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">角色数据</div>
-                    <div class="metric-value">{{ "{:,}".format(data_generation_stats.roles_generated or 0) }}</div>
-                    <div class="metric-unit">条记录</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">权限数据</div>
-                    <div class="metric-value">{{ "{:,}".format(data_generation_stats.permissions_generated or 0) }}</div>
-                    <div class="metric-unit">条记录</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">关联关系</div>
-                    <div class="metric-value">{{ "{:,}".format((data_generation_stats.user_roles_generated or 0) + (data_generation_stats.role_permissions_generated or 0)) }}</div>
-                    <div class="metric-unit">条记录</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">操作日志</div>
-                    <div class="metric-value">{{ "{:,}".format(data_generation_stats.audit_logs_generated or 0) }}</div>
-                    <div class="metric-unit">条记录</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">生成耗时</div>
-                    <div class="metric-value">{{ data_generation_duration }}</div>
-                </div>
-            </div>
-        </div>
-        {% endif %}
-
-        <!-- 用户认证测试 -->
-        {% if test_results.authentication %}
-        <div class="section">
-            <h2>🔐 用户认证性能测试</h2>
-            {% set auth = test_results.authentication %}
-            
-            {% if auth.single_login %}
-            <h3>单次登录测试</h3>
-            <div class="metrics-grid">
-                <div class="metric-card">
-                    <div class="metric-title">平均响应时间</div>
-                    <div class="metric-value">{{ "%.2f"|format(auth.single_login.avg_time * 1000) }}</div>
-                    <div class="metric-unit">毫秒</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">P95响应时间</div>
-                    <div class="metric-value">{{ "%.2f"|format(auth.single_login.p95_time * 1000) }}</div>
-                    <div class="metric-unit">毫秒</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">最快响应时间</div>
-                    <div class="metric-value">{{ "%.2f"|format(auth.single_login.min_time * 1000) }}</div>
-                    <div class="metric-unit">毫秒</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">最慢响应时间</div>
-                    <div class="metric-value">{{ "%.2f"|format(auth.single_login.max_time * 1000) }}</div>
-                    <div class="metric-unit">毫秒</div>
-                </div>
-            </div>
-            {% endif %}
-
-            {% if auth.concurrent_login %}
-            <h3>并发登录测试</h3>
-            <table class="table">
-                <thead>
-                    <tr>
-                        <th>并发用户数</th>
-                        <th>总耗时(秒)</th>
-                        <th>平均响应时间(毫秒)</th>
-                        <th>每秒请求数</th>
-                        <th>成功率</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {% for key, result in auth.concurrent_login.items() %}
-                    <tr>
-                        <td>{{ result.concurrent_users }}</td>
-                        <td>{{ "%.2f"|format(result.total_time) }}</td>
-                        <td>{{ "%.2f"|format(result.avg_time_per_request * 1000) }}</td>
-                        <td>{{ "%.2f"|format(result.requests_per_second) }}</td>
-                        <td class="{% if result.success_rate >= 0.95 %}status-success{% elif result.success_rate >= 0.9 %}status-warning{% else %}status-danger{% endif %}">
-                            {{ "%.1f"|format(result.success_rate * 100) }}%
-                        </td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
-            {% endif %}
-        </div>
-        {% endif %}
-
-        <!-- 权限查询测试 -->
-        {% if test_results.permission_query %}
-        <div class="section">
-            <h2>🔍 权限查询性能测试</h2>
-            {% set perm = test_results.permission_query %}
-            
-            {% if perm.single_query %}
-            <h3>单用户权限查询</h3>
-            <div class="metrics-grid">
-                <div class="metric-card {% if perm.single_query.avg_time <= 0.05 %}{% elif perm.single_query.avg_time <= 0.1 %}warning{% else %}danger{% endif %}">
-                    <div class="metric-title">平均响应时间</div>
-                    <div class="metric-value">{{ "%.2f"|format(perm.single_query.avg_time * 1000) }}</div>
-                    <div class="metric-unit">毫秒</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">P95响应时间</div>
-                    <div class="metric-value">{{ "%.2f"|format(perm.single_query.p95_time * 1000) }}</div>
-                    <div class="metric-unit">毫秒</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">测试次数</div>
-                    <div class="metric-value">{{ "{:,}".format(perm.single_query.count) }}</div>
-                    <div class="metric-unit">次</div>
-                </div>
-            </div>
-            {% endif %}
-
-            {% if perm.batch_query %}
-            <h3>批量权限查询</h3>
-            <table class="table">
-                <thead>
-                    <tr>
-                        <th>批量大小</th>
-                        <th>平均总时间(毫秒)</th>
-                        <th>平均单用户时间(毫秒)</th>
-                        <th>最快时间(毫秒)</th>
-                        <th>最慢时间(毫秒)</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {% for key, result in perm.batch_query.items() %}
-                    <tr>
-                        <td>{{ result.batch_size }}</td>
-                        <td>{{ "%.2f"|format(result.avg_time * 1000) }}</td>
-                        <td>{{ "%.2f"|format(result.avg_time_per_user * 1000) }}</td>
-                        <td>{{ "%.2f"|format(result.min_time * 1000) }}</td>
-                        <td>{{ "%.2f"|format(result.max_time * 1000) }}</td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
-            {% endif %}
-        </div>
-        {% endif %}
-
-        <!-- 数据操作测试 -->
-        {% if test_results.data_operations %}
-        <div class="section">
-            <h2>💾 数据操作性能测试</h2>
-            {% set data_ops = test_results.data_operations %}
-            
-            {% if data_ops.user_crud %}
-            <h3>用户CRUD操作</h3>
-            <table class="table">
-                <thead>
-                    <tr>
-                        <th>操作类型</th>
-                        <th>测试次数</th>
-                        <th>平均时间(毫秒)</th>
-                        <th>最快时间(毫秒)</th>
-                        <th>最慢时间(毫秒)</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {% for operation, result in data_ops.user_crud.items() %}
-                    <tr>
-                        <td>{{ operation.upper() }}</td>
-                        <td>{{ result.count }}</td>
-                        <td>{{ "%.2f"|format(result.avg_time * 1000) }}</td>
-                        <td>{{ "%.2f"|format(result.min_time * 1000) }}</td>
-                        <td>{{ "%.2f"|format(result.max_time * 1000) }}</td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
-            {% endif %}
-
-            {% if data_ops.batch_operations %}
-            <h3>批量操作性能</h3>
-            <table class="table">
-                <thead>
-                    <tr>
-                        <th>批量大小</th>
-                        <th>总时间(秒)</th>
-                        <th>单条记录时间(毫秒)</th>
-                        <th>每秒处理记录数</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {% for key, result in data_ops.batch_operations.items() %}
-                    <tr>
-                        <td>{{ result.batch_size }}</td>
-                        <td>{{ "%.3f"|format(result.total_time) }}</td>
-                        <td>{{ "%.2f"|format(result.time_per_record * 1000) }}</td>
-                        <td>{{ "%.0f"|format(result.records_per_second) }}</td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
-            {% endif %}
-        </div>
-        {% endif %}
-
-        <!-- 压力测试 -->
-        {% if test_results.stress_test %}
-        <div class="section">
-            <h2>⚡ 系统压力测试</h2>
-            {% set stress = test_results.stress_test %}
-            
-            <div class="metrics-grid">
-                <div class="metric-card">
-                    <div class="metric-title">测试时长</div>
-                    <div class="metric-value">{{ stress.duration_minutes }}</div>
-                    <div class="metric-unit">分钟</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">并发用户数</div>
-                    <div class="metric-value">{{ stress.concurrent_users }}</div>
-                    <div class="metric-unit">用户</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">总操作数</div>
-                    <div class="metric-value">{{ "{:,}".format(stress.total_operations) }}</div>
-                    <div class="metric-unit">次</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">成功操作数</div>
-                    <div class="metric-value">{{ "{:,}".format(stress.successful_operations) }}</div>
-                    <div class="metric-unit">次</div>
-                </div>
-                <div class="metric-card {% if stress.error_rate <= 0.01 %}{% elif stress.error_rate <= 0.05 %}warning{% else %}danger{% endif %}">
-                    <div class="metric-title">错误率</div>
-                    <div class="metric-value">{{ "%.2f"|format(stress.error_rate * 100) }}</div>
-                    <div class="metric-unit">%</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">每秒操作数</div>
-                    <div class="metric-value">{{ "%.2f"|format(stress.operations_per_second) }}</div>
-                    <div class="metric-unit">ops/s</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">平均响应时间</div>
-                    <div class="metric-value">{{ "%.2f"|format(stress.avg_response_time * 1000) }}</div>
-                    <div class="metric-unit">毫秒</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-title">最大响应时间</div>
-                    <div class="metric-value">{{ "%.2f"|format(stress.max_response_time * 1000) }}</div>
-                    <div class="metric-unit">毫秒</div>
-                </div>
-            </div>
-        </div>
-        {% endif %}
-
-        <div class="footer">
-            <p>RBAC权限系统测试报告 - 生成于 {{ report_time }}</p>
-            <p>测试工具版本: v1.0.0</p>
-        </div>
-    </div>
-</body>
-</html>
-        """
+        # 报告按内容摘要命名，相同结果的报告已存在时直接复用
+        html_file = os.path.join(self.output_dir, f'test_report_{_content_digest(test_results, data_generation_stats)}.html')
+        if os.path.exists(html_file):
+            self.logger.info("HTML报告已存在，跳过生成: %s", html_file)
+            return html_file
         
-        # 准备模板数据
+        # 数据生成统计：缺失的记录数按0展示，关联关系为两类关联之和
+        data_generation_view = None
+        if data_generation_stats:
+            counts = {key: data_generation_stats.get(key) or 0 for key in DATA_GENERATION_COUNT_KEYS}
+            counts['relations_generated'] = counts['user_roles_generated'] + counts['role_permissions_generated']
+            data_generation_view = _materialize_view(counts)
+        
+        # 准备模板数据，数值预先格式化，模板中不再做单位换算和格式过滤
         template_data = {
-            'test_results': test_results,
-            'data_generation_stats': data_generation_stats,
-            'report_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'test_results': _materialize_view(test_results),
+            'data_generation_stats': data_generation_view,
+            'report_time': now.strftime('%Y-%m-%d %H:%M:%S'),
             'test_env': 'Development',
             'test_duration': self._calculate_duration(test_results.get('start_time'), test_results.get('end_time')),
             'data_generation_duration': self._calculate_duration(
@@ -510,54 +429,68 @@ class ReportGenerator:
             )
         }
         
-        # 渲染模板
-        template = Template(html_template)
-        html_content = template.render(**template_data)
+        # 随结果规模增长的表格行直接用f-string拼接，不经过模板循环
+        view = _normalize(test_results)
+        template_data['concurrent_login_rows'] = _render_concurrent_login_rows(view.auth.get('concurrent_login') or {})
+        template_data['batch_query_rows'] = _render_batch_query_rows(view.perm.get('batch_query') or {})
+        template_data['user_crud_rows'] = _render_user_crud_rows(view.data_ops.get('user_crud') or {})
+        template_data['batch_operation_rows'] = _render_batch_operation_rows(view.data_ops.get('batch_operations') or {})
         
-        # 保存HTML文件
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        html_file = os.path.join(self.output_dir, f'test_report_{timestamp}.html')
+        # 压力测试指标卡片一次性格式化
+        template_data['stress_block'] = _render_stress_block(view.stress) if view.stress else ''
         
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # 流式渲染模板，分块写入带1MiB缓冲的文件，不在内存中拼出整份HTML
+        stream = self._get_html_template().stream(**template_data)
+        stream.enable_buffering(size=64)
+        with _atomic_output(html_file) as tmp_file:
+            with open(tmp_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                stream.dump(f)
         
-        self.logger.info(f"HTML报告生成完成: {html_file}")
+        self.logger.info("HTML报告生成完成: %s", html_file)
         return html_file
 
     def generate_json_report(self, test_results: Dict[str, Any],
-                           data_generation_stats: Dict[str, Any] = None) -> str:
+                           data_generation_stats: Dict[str, Any] = None,
+                           now: datetime = None,
+                           summary: Dict[str, Any] = None) -> str:
         """
         生成JSON格式的测试报告
 
         Args:
             test_results: 性能测试结果
             data_generation_stats: 数据生成统计
+            now: 报告生成时间，未指定时取当前时间
+            summary: 已生成的测试摘要，未指定时在此生成
 
         Returns:
             str: 生成的JSON文件路径
         """
         self.logger.info("生成JSON测试报告...")
+        now = now or datetime.now()
+
+        # 报告按内容摘要命名，相同结果的报告已存在时直接复用
+        json_file = os.path.join(self.output_dir, f'test_report_{_content_digest(test_results, data_generation_stats)}.json')
+        if os.path.exists(json_file):
+            self.logger.info("JSON报告已存在，跳过生成: %s", json_file)
+            return json_file
 
         # 准备报告数据
         report_data = {
             'report_info': {
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': now.isoformat(timespec='seconds'),
                 'generator_version': '1.0.0',
                 'test_environment': 'development'
             },
             'test_results': test_results,
             'data_generation_stats': data_generation_stats,
-            'summary': self._generate_summary(test_results, data_generation_stats)
+            'summary': summary if summary is not None else self._generate_summary(test_results, data_generation_stats)
         }
 
         # 保存JSON文件
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        json_file = os.path.join(self.output_dir, f'test_report_{timestamp}.json')
+        with _atomic_output(json_file) as tmp_file:
+            _dump_json(report_data, tmp_file)
 
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False, default=str)
-
-        self.logger.info(f"JSON报告生成完成: {json_file}")
+        self.logger.info("JSON报告生成完成: %s", json_file)
         return json_file
 
     def _generate_summary(self, test_results: Dict[str, Any],
@@ -574,23 +507,19 @@ class ReportGenerator:
         }
 
         # 性能指标摘要
-        if 'authentication' in test_results and test_results['authentication']:
-            auth = test_results['authentication']
-            if 'single_login' in auth:
-                summary['performance_metrics']['avg_login_time_ms'] = auth['single_login']['avg_time'] * 1000
-                summary['performance_metrics']['p95_login_time_ms'] = auth['single_login']['p95_time'] * 1000
-
-        if 'permission_query' in test_results and test_results['permission_query']:
-            perm = test_results['permission_query']
-            if 'single_query' in perm:
-                summary['performance_metrics']['avg_permission_query_time_ms'] = perm['single_query']['avg_time'] * 1000
-                summary['performance_metrics']['p95_permission_query_time_ms'] = perm['single_query']['p95_time'] * 1000
-
-        if 'stress_test' in test_results and test_results['stress_test']:
-            stress = test_results['stress_test']
-            summary['performance_metrics']['operations_per_second'] = stress.get('operations_per_second', 0)
-            summary['performance_metrics']['error_rate'] = stress.get('error_rate', 0)
-            summary['performance_metrics']['avg_response_time_ms'] = stress.get('avg_response_time', 0) * 1000
+        view = _normalize(test_results)
+        if view.single_login:
+            summary['performance_metrics']['avg_login_time_ms'] = view.single_login['avg_time'] * 1000
+            summary['performance_metrics']['p95_login_time_ms'] = view.single_login['p95_time'] * 1000
+
+        if view.single_query:
+            summary['performance_metrics']['avg_permission_query_time_ms'] = view.single_query['avg_time'] * 1000
+            summary['performance_metrics']['p95_permission_query_time_ms'] = view.single_query['p95_time'] * 1000
+
+        if view.stress:
+            summary['performance_metrics']['operations_per_second'] = view.stress.get('operations_per_second', 0)
+            summary['performance_metrics']['error_rate'] = view.stress.get('error_rate', 0)
+            summary['performance_metrics']['avg_response_time_ms'] = view.stress.get('avg_response_time', 0) * 1000
 
         # 数据生成指标摘要
         if data_generation_stats:
@@ -614,25 +543,15 @@ class ReportGenerator:
         if not start_time or not end_time:
             return "未知"
 
-        try:
-            if isinstance(start_time, str):
-                start_time = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-            if isinstance(end_time, str):
-                end_time = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-
-            duration = end_time - start_time
+        # 统一转为ISO字符串作为缓存键，同一对时间只解析和计算一次
+        if isinstance(start_time, datetime):
+            start_time = start_time.isoformat()
+        if isinstance(end_time, datetime):
+            end_time = end_time.isoformat()
 
-            hours, remainder = divmod(duration.total_seconds(), 3600)
-            minutes, seconds = divmod(remainder, 60)
-
-            if hours > 0:
-                return f"{int(hours)}小时{int(minutes)}分钟{int(seconds)}秒"
-            elif minutes > 0:
-                return f"{int(minutes)}分钟{int(seconds)}秒"
-            else:
-                return f"{duration.total_seconds():.2f}秒"
-
-        except Exception:
+        try:
+            return _calc_duration_cached(start_time, end_time)
+        except TypeError:
             return "计算失败"
 
     def generate_performance_analysis(self, test_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -651,80 +570,71 @@ class ReportGenerator:
             'recommendations': [],
             'benchmark_comparison': {}
         }
-
-        # 基准值比较
-        benchmarks = {
-            'login_response_time': 0.5,      # 500ms
-            'permission_query_time': 0.05,   # 50ms
-            'operations_per_second': 1000,
-            'error_rate_threshold': 0.01     # 1%
-        }
+        bottlenecks = set()
 
         issues = []
         good_metrics = []
 
+        view = _normalize(test_results)
+
         # 分析登录性能
-        if 'authentication' in test_results and test_results['authentication']:
-            auth = test_results['authentication']
-            if 'single_login' in auth:
-                avg_time = auth['single_login']['avg_time']
-                if avg_time > benchmarks['login_response_time']:
-                    issues.append(f"登录响应时间过长: {avg_time*1000:.2f}ms (基准: {benchmarks['login_response_time']*1000}ms)")
-                    analysis['bottlenecks'].append('用户认证性能')
-                else:
-                    good_metrics.append('登录响应时间')
-
-                analysis['benchmark_comparison']['login_time'] = {
-                    'actual': avg_time * 1000,
-                    'benchmark': benchmarks['login_response_time'] * 1000,
-                    'status': 'pass' if avg_time <= benchmarks['login_response_time'] else 'fail'
-                }
+        if view.single_login:
+            avg_time = view.single_login['avg_time']
+            if avg_time > _BENCHMARKS['login_response_time']:
+                issues.append(f"登录响应时间过长: {avg_time*1000:.2f}ms (基准: {_BENCHMARKS['login_response_time']*1000}ms)")
+                bottlenecks.add('用户认证性能')
+            else:
+                good_metrics.append('登录响应时间')
+
+            analysis['benchmark_comparison']['login_time'] = {
+                'actual': avg_time * 1000,
+                'benchmark': _BENCHMARKS['login_response_time'] * 1000,
+                'status': 'pass' if avg_time <= _BENCHMARKS['login_response_time'] else 'fail'
+            }
 
         # 分析权限查询性能
-        if 'permission_query' in test_results and test_results['permission_query']:
-            perm = test_results['permission_query']
-            if 'single_query' in perm:
-                avg_time = perm['single_query']['avg_time']
-                if avg_time > benchmarks['permission_query_time']:
-                    issues.append(f"权限查询时间过长: {avg_time*1000:.2f}ms (基准: {benchmarks['permission_query_time']*1000}ms)")
-                    analysis['bottlenecks'].append('权限查询性能')
-                else:
-                    good_metrics.append('权限查询时间')
-
-                analysis['benchmark_comparison']['permission_query_time'] = {
-                    'actual': avg_time * 1000,
-                    'benchmark': benchmarks['permission_query_time'] * 1000,
-                    'status': 'pass' if avg_time <= benchmarks['permission_query_time'] else 'fail'
-                }
+        if view.single_query:
+            avg_time = view.single_query['avg_time']
+            if avg_time > _BENCHMARKS['permission_query_time']:
+                issues.append(f"权限查询时间过长: {avg_time*1000:.2f}ms (基准: {_BENCHMARKS['permission_query_time']*1000}ms)")
+                bottlenecks.add('权限查询性能')
+            else:
+                good_metrics.append('权限查询时间')
+
+            analysis['benchmark_comparison']['permission_query_time'] = {
+                'actual': avg_time * 1000,
+                'benchmark': _BENCHMARKS['permission_query_time'] * 1000,
+                'status': 'pass' if avg_time <= _BENCHMARKS['permission_query_time'] else 'fail'
+            }
 
         # 分析压力测试结果
-        if 'stress_test' in test_results and test_results['stress_test']:
-            stress = test_results['stress_test']
+        if view.stress:
+            stress = view.stress
 
             ops_per_sec = stress.get('operations_per_second', 0)
-            if ops_per_sec < benchmarks['operations_per_second']:
-                issues.append(f"系统吞吐量不足: {ops_per_sec:.2f} ops/s (基准: {benchmarks['operations_per_second']} ops/s)")
-                analysis['bottlenecks'].append('系统吞吐量')
+            if ops_per_sec < _BENCHMARKS['operations_per_second']:
+                issues.append(f"系统吞吐量不足: {ops_per_sec:.2f} ops/s (基准: {_BENCHMARKS['operations_per_second']} ops/s)")
+                bottlenecks.add('系统吞吐量')
             else:
                 good_metrics.append('系统吞吐量')
 
             error_rate = stress.get('error_rate', 0)
-            if error_rate > benchmarks['error_rate_threshold']:
-                issues.append(f"错误率过高: {error_rate*100:.2f}% (基准: {benchmarks['error_rate_threshold']*100}%)")
-                analysis['bottlenecks'].append('系统稳定性')
+            if error_rate > _BENCHMARKS['error_rate_threshold']:
+                issues.append(f"错误率过高: {error_rate*100:.2f}% (基准: {_BENCHMARKS['error_rate_threshold']*100}%)")
+                bottlenecks.add('系统稳定性')
             else:
                 good_metrics.append('系统稳定性')
 
             analysis['benchmark_comparison']['operations_per_second'] = {
                 'actual': ops_per_sec,
-                'benchmark': benchmarks['operations_per_second'],
-                'status': 'pass' if ops_per_sec >= benchmarks['operations_per_second'] else 'fail'
+                'benchmark': _BENCHMARKS['operations_per_second'],
+                'status': 'pass' if ops_per_sec >= _BENCHMARKS['operations_per_second'] else 'fail'
             }
 
             analysis['benchmark_comparison']['error_rate'] = {
                 'actual': error_rate * 100,
-                'benchmark': benchmarks['error_rate_threshold'] * 100,
-                'status': 'pass' if error_rate <= benchmarks['error_rate_threshold'] else 'fail'
+                'benchmark': _BENCHMARKS['error_rate_threshold'] * 100,
+                'status': 'pass' if error_rate <= _BENCHMARKS['error_rate_threshold'] else 'fail'
             }
 
         # 生成总体评级
@@ -737,18 +647,9 @@ class ReportGenerator:
         else:
             analysis['overall_rating'] = 'poor'
 
-        # 生成优化建议
-        if '用户认证性能' in analysis['bottlenecks']:
-            analysis['recommendations'].append('优化用户认证查询，考虑添加用户名索引或使用缓存')
-
-        if '权限查询性能' in analysis['bottlenecks']:
-            analysis['recommendations'].append('优化权限查询SQL，考虑创建复合索引或使用权限缓存')
-
-        if '系统吞吐量' in analysis['bottlenecks']:
-            analysis['recommendations'].append('增加数据库连接池大小，考虑读写分离或分库分表')
-
-        if '系统稳定性' in analysis['bottlenecks']:
-            analysis['recommendations'].append('检查错误日志，优化异常处理和重试机制')
+        # 生成优化建议（按固定顺序输出瓶颈和对应建议）
+        analysis['bottlenecks'] = [name for name in _RECOMMENDATIONS if name in bottlenecks]
+        analysis['recommendations'] = [_RECOMMENDATIONS[name] for name in analysis['bottlenecks']]
 
         if not analysis['recommendations']:
             analysis['recommendations'].append('系统性能表现良好，建议定期监控和维护')
@@ -769,17 +670,22 @@ class ReportGenerator:
         """
         self.logger.info("生成完整测试报告...")
 
-        # 添加性能分析
-        test_results['performance_analysis'] = self.generate_performance_analysis(test_results)
-
-        # 生成HTML和JSON报告
-        html_file = self.generate_html_report(test_results, data_generation_stats)
-        json_file = self.generate_json_report(test_results, data_generation_stats)
-
-        return {
-            'html': html_file,
-            'json': json_file
-        }
+        # 性能分析和测试摘要各计算一次，供两份报告共用
+        analysis = self.generate_performance_analysis(test_results)
+        summary = self._generate_summary(test_results, data_generation_stats)
+        test_results['performance_analysis'] = analysis
+
+        # 并行生成HTML和JSON报告（两者只读测试结果），共用同一个生成时间
+        now = datetime.now()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            html_future = executor.submit(self.generate_html_report, test_results, data_generation_stats, now=now)
+            json_future = executor.submit(self.generate_json_report, test_results, data_generation_stats,
+                                          now=now, summary=summary)
+
+            return {
+                'html': html_future.result(),
+                'json': json_future.result()
+            }
 
 
 def main():
@@ -796,8 +702,7 @@ def main():
 
     # 加载测试结果
     try:
-        with open(args.test_results, 'r', encoding='utf-8') as f:
-            test_results = json.load(f)
+        test_results = _load_json(args.test_results)
     except Exception as e:
         print(f"加载测试结果失败: {e}")
         return 1
@@ -806,8 +711,9 @@ def main():
     data_stats = None
     if args.data_stats:
         try:
-            with open(args.data_stats, 'r', encoding='utf-8') as f:
-                data_stats = json.load(f)
+            # 空文件或空对象（不超过2字节）无需解析
+            if os.path.getsize(args.data_stats) > 2:
+                data_stats = _load_json(args.data_stats)
         except Exception as e:
             print(f"加载数据生成统计失败: {e}")
 
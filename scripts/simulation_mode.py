@@ -13,7 +13,7 @@ import os
 import time
 import random
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 import json
 
 # 添加项目根目录到Python路径
@@ -26,30 +26,72 @@ except ImportError:
     print("请运行: pip install tqdm")
     sys.exit(1)
 
+try:
+    import orjson  # 可选依赖，存在时用于快速写出模拟报告
+except ImportError:
+    orjson = None
+
 from config.test_config import get_config, get_scenario
 
 
+def _flatten_metrics(results: Dict[str, Any]) -> Dict[Tuple[str, str], Any]:
+    """
+    将测试结果展开为以 (测试段路径, 指标名) 为键的扁平字典
+    
+    *_time 指标换算为毫秒，其他数值原样保留。
+    
+    Args:
+        results: 性能测试结果
+        
+    Returns:
+        Dict[Tuple[str, str], Any]: 扁平化的指标，如 ('authentication.single_login', 'avg_time')
+    """
+    metrics = {}
+    stack = [(key, value) for key, value in results.items() if isinstance(value, dict)]
+    while stack:
+        section, node = stack.pop()
+        for metric, value in node.items():
+            if isinstance(value, dict):
+                stack.append((f"{section}.{metric}", value))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                metrics[(section, metric)] = value * 1000 if metric.endswith('_time') else value
+    return metrics
+
+
 class SimulationDataGenerator:
     """模拟数据生成器"""
     
+    # 各类数据的计数字段及展示名称
+    _COUNTERS = (
+        'users_generated', 'roles_generated', 'permissions_generated',
+        'user_roles_generated', 'role_permissions_generated', 'audit_logs_generated'
+    )
+    _COUNTER_LABELS = {
+        'users_generated': '用户数据',
+        'roles_generated': '角色数据',
+        'permissions_generated': '权限数据',
+        'user_roles_generated': '用户角色关联',
+        'role_permissions_generated': '角色权限关联',
+        'audit_logs_generated': '操作日志'
+    }
+    
     def __init__(self, config_env: str = None, scenario: str = 'standard_test'):
         """初始化模拟数据生成器"""
         self.config = get_config(config_env)
         self.scenario_config = get_scenario(scenario)
         self.scenario = scenario
         
+        # 单调时钟起止点，用于计算生成耗时
+        self._t0 = 0.0
+        self._t1 = 0.0
+        
         # 统计信息
-        self.stats = {
-            'users_generated': 0,
-            'roles_generated': 0,
-            'permissions_generated': 0,
-            'user_roles_generated': 0,
-            'role_permissions_generated': 0,
-            'audit_logs_generated': 0,
+        self.stats = dict.fromkeys(self._COUNTERS, 0)
+        self.stats.update({
             'start_time': None,
             'end_time': None,
             'errors': []
-        }
+        })
         
         print(f"🎭 模拟模式：数据生成器初始化完成，场景: {scenario}")
     
@@ -57,6 +99,7 @@ class SimulationDataGenerator:
         """模拟生成所有测试数据"""
         print("🎭 模拟模式：开始生成测试数据...")
         self.stats['start_time'] = datetime.now()
+        self._t0 = time.perf_counter()
         
         # 获取数据规模
         data_scale = self.scenario_config['data_scale']
@@ -64,106 +107,100 @@ class SimulationDataGenerator:
         # 模拟生成用户数据
         print("👥 模拟生成用户数据...")
         user_count = data_scale['users']
-        with tqdm(total=user_count, desc="生成用户") as pbar:
-            for i in range(0, user_count, 100):
-                time.sleep(0.01)  # 模拟处理时间
-                batch_size = min(100, user_count - i)
-                self.stats['users_generated'] += batch_size
-                pbar.update(batch_size)
+        self._simulate_phase("生成用户", user_count, 100, 0.01)
+        self.stats['users_generated'] = user_count
         
         # 模拟生成角色数据
         print("🎭 模拟生成角色数据...")
         role_count = data_scale['roles']
-        with tqdm(total=role_count, desc="生成角色") as pbar:
-            for i in range(0, role_count, 50):
-                time.sleep(0.005)
-                batch_size = min(50, role_count - i)
-                self.stats['roles_generated'] += batch_size
-                pbar.update(batch_size)
+        self._simulate_phase("生成角色", role_count, 50, 0.005)
+        self.stats['roles_generated'] = role_count
         
         # 模拟生成权限数据
         print("🔐 模拟生成权限数据...")
         permission_count = data_scale['permissions']
-        with tqdm(total=permission_count, desc="生成权限") as pbar:
-            for i in range(0, permission_count, 100):
-                time.sleep(0.008)
-                batch_size = min(100, permission_count - i)
-                self.stats['permissions_generated'] += batch_size
-                pbar.update(batch_size)
+        self._simulate_phase("生成权限", permission_count, 100, 0.008)
+        self.stats['permissions_generated'] = permission_count
         
         # 模拟生成用户角色关联
         print("🔗 模拟生成用户角色关联...")
         user_role_count = user_count * 4  # 平均每用户4个角色
-        with tqdm(total=user_role_count, desc="生成用户角色关联") as pbar:
-            for i in range(0, user_role_count, 200):
-                time.sleep(0.01)
-                batch_size = min(200, user_role_count - i)
-                self.stats['user_roles_generated'] += batch_size
-                pbar.update(batch_size)
+        self._simulate_phase("生成用户角色关联", user_role_count, 200, 0.01)
+        self.stats['user_roles_generated'] = user_role_count
         
         # 模拟生成角色权限关联
         print("🔗 模拟生成角色权限关联...")
         role_permission_count = role_count * 15  # 平均每角色15个权限
-        with tqdm(total=role_permission_count, desc="生成角色权限关联") as pbar:
-            for i in range(0, role_permission_count, 150):
-                time.sleep(0.008)
-                batch_size = min(150, role_permission_count - i)
-                self.stats['role_permissions_generated'] += batch_size
-                pbar.update(batch_size)
+        self._simulate_phase("生成角色权限关联", role_permission_count, 150, 0.008)
+        self.stats['role_permissions_generated'] = role_permission_count
         
         # 模拟生成操作日志
         print("📝 模拟生成操作日志...")
         audit_count = data_scale['audit_logs']
-        with tqdm(total=audit_count, desc="生成操作日志") as pbar:
-            for i in range(0, audit_count, 1000):
-                time.sleep(0.02)
-                batch_size = min(1000, audit_count - i)
-                self.stats['audit_logs_generated'] += batch_size
-                pbar.update(batch_size)
+        self._simulate_phase("生成操作日志", audit_count, 1000, 0.02)
+        self.stats['audit_logs_generated'] = audit_count
         
         self.stats['end_time'] = datetime.now()
+        self._t1 = time.perf_counter()
         
         # 输出统计信息
-        self._print_statistics()
+        total_records = (user_count + role_count + permission_count +
+                         user_role_count + role_permission_count + audit_count)
+        self._print_statistics(total_records)
         
         return True
     
-    def _print_statistics(self):
-        """打印统计信息"""
-        duration = self.stats['end_time'] - self.stats['start_time']
-        
-        print("\n" + "="*60)
-        print("📊 模拟数据生成统计报告")
-        print("="*60)
-        print(f"开始时间: {self.stats['start_time'].strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"结束时间: {self.stats['end_time'].strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"总耗时: {duration}")
-        print()
-        print("生成数据统计:")
-        print(f"  用户数据: {self.stats['users_generated']:,} 条")
-        print(f"  角色数据: {self.stats['roles_generated']:,} 条")
-        print(f"  权限数据: {self.stats['permissions_generated']:,} 条")
-        print(f"  用户角色关联: {self.stats['user_roles_generated']:,} 条")
-        print(f"  角色权限关联: {self.stats['role_permissions_generated']:,} 条")
-        print(f"  操作日志: {self.stats['audit_logs_generated']:,} 条")
-        
-        total_records = sum([
-            self.stats['users_generated'],
-            self.stats['roles_generated'],
-            self.stats['permissions_generated'],
-            self.stats['user_roles_generated'],
-            self.stats['role_permissions_generated'],
-            self.stats['audit_logs_generated']
-        ])
-        
-        print(f"\n总记录数: {total_records:,} 条")
-        
-        if duration.total_seconds() > 0:
-            rate = total_records / duration.total_seconds()
-            print(f"生成速率: {rate:.2f} 条/秒")
-        
-        print("\n✅ 模拟数据生成完成")
-        print("="*60)
+    def _simulate_phase(self, desc: str, count: int, batch_size: int, batch_delay: float):
+        """
+        模拟一个数据生成阶段
+        
+        按批次数一次性休眠整个阶段的模拟处理时间，进度条一次推进到位，
+        不再逐批次调用sleep和update。
+        
+        Args:
+            desc: 进度条描述
+            count: 生成记录数
+            batch_size: 每批记录数
+            batch_delay: 每批模拟处理时间（秒）
+        """
+        # 限制刷新频率，每个阶段最多刷新约100次
+        with tqdm(total=count, desc=desc, mininterval=0.2,
+                  miniters=max(1, count // 100), leave=False) as pbar:
+            time.sleep(-(-count // batch_size) * batch_delay)
+            pbar.update(count)
+    
+    def _print_statistics(self, total_records: int):
+        """
+        打印统计信息
+        
+        Args:
+            total_records: 生成的总记录数
+        """
+        # 耗时取单调时钟差值，起止时间只用于展示
+        duration_s = self._t1 - self._t0
+        
+        # 先收集所有行，最后一次写出
+        out = []
+        out.append("\n" + "="*60)
+        out.append("📊 模拟数据生成统计报告")
+        out.append("="*60)
+        out.append(f"开始时间: {self.stats['start_time'].strftime('%Y-%m-%d %H:%M:%S')}")
+        out.append(f"结束时间: {self.stats['end_time'].strftime('%Y-%m-%d %H:%M:%S')}")
+        out.append(f"总耗时: {duration_s:.2f}秒")
+        out.append("")
+        out.append("生成数据统计:")
+        for key in self._COUNTERS:
+            out.append(f"  {self._COUNTER_LABELS[key]}: {self.stats[key]:,} 条")
+        
+        out.append(f"\n总记录数: {total_records:,} 条")
+        
+        if duration_s > 0:
+            rate = total_records / duration_s
+            out.append(f"生成速率: {rate:.2f} 条/秒")
+        
+        out.append("\n✅ 模拟数据生成完成")
+        out.append("="*60)
+        sys.stdout.write("\n".join(out) + "\n")
     
     def cleanup_data(self):
         """模拟清理数据"""
@@ -332,31 +369,31 @@ class SimulationPerformanceTest:
     
     def _print_summary(self, results):
         """打印测试摘要"""
-        print("\n" + "="*60)
-        print("📊 模拟性能测试报告摘要")
-        print("="*60)
-        
-        auth = results['authentication']
-        if 'single_login' in auth:
-            single = auth['single_login']
-            print(f"🔐 用户认证测试:")
-            print(f"  单次登录平均时间: {single['avg_time']*1000:.2f}ms")
-            print(f"  P95响应时间: {single['p95_time']*1000:.2f}ms")
-        
-        perm = results['permission_query']
-        if 'single_query' in perm:
-            single = perm['single_query']
-            print(f"🔍 权限查询测试:")
-            print(f"  单次查询平均时间: {single['avg_time']*1000:.2f}ms")
-            print(f"  P95响应时间: {single['p95_time']*1000:.2f}ms")
-        
-        stress = results['stress_test']
-        print(f"⚡ 压力测试:")
-        print(f"  每秒操作数: {stress['operations_per_second']:.2f}")
-        print(f"  错误率: {stress['error_rate']*100:.2f}%")
-        print(f"  平均响应时间: {stress['avg_response_time']*1000:.2f}ms")
-        
-        print("="*60)
+        metrics = _flatten_metrics(results)
+        
+        # 先收集所有行，最后一次写出
+        out = []
+        out.append("\n" + "="*60)
+        out.append("📊 模拟性能测试报告摘要")
+        out.append("="*60)
+        
+        if 'single_login' in results['authentication']:
+            out.append(f"🔐 用户认证测试:")
+            out.append(f"  单次登录平均时间: {metrics[('authentication.single_login', 'avg_time')]:.2f}ms")
+            out.append(f"  P95响应时间: {metrics[('authentication.single_login', 'p95_time')]:.2f}ms")
+        
+        if 'single_query' in results['permission_query']:
+            out.append(f"🔍 权限查询测试:")
+            out.append(f"  单次查询平均时间: {metrics[('permission_query.single_query', 'avg_time')]:.2f}ms")
+            out.append(f"  P95响应时间: {metrics[('permission_query.single_query', 'p95_time')]:.2f}ms")
+        
+        out.append(f"⚡ 压力测试:")
+        out.append(f"  每秒操作数: {metrics[('stress_test', 'operations_per_second')]:.2f}")
+        out.append(f"  错误率: {metrics[('stress_test', 'error_rate')]*100:.2f}%")
+        out.append(f"  平均响应时间: {metrics[('stress_test', 'avg_response_time')]:.2f}ms")
+        
+        out.append("="*60)
+        sys.stdout.write("\n".join(out) + "\n")
     
     def close(self):
         """关闭连接（模拟）"""
@@ -391,8 +428,18 @@ def create_simulation_report(test_results: Dict[str, Any], data_stats: Dict[str,
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     report_file = f"reports/simulation_report_{timestamp}.json"
     
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(report_data, f, indent=2, ensure_ascii=False, default=str)
+    # 安装了orjson时一次序列化为字节整体写出，否则回退到标准库json
+    if orjson is not None:
+        # datetime也交给default=str处理，输出格式与标准库分支一致
+        payload = orjson.dumps(report_data, default=str,
+                               option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        with open(report_file, 'wb') as f:
+            f.write(payload)
+    else:
+        # 增量编码逐段写出，不在内存中构造完整JSON字符串；1MiB缓冲把各段合并成少量write系统调用
+        encoder = json.JSONEncoder(indent=2, ensure_ascii=False, default=str)
+        with open(report_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines(encoder.iterencode(report_data))
     
     print(f"✅ 模拟报告生成完成: {report_file}")
     return report_file
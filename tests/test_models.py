@@ -0,0 +1,152 @@
+"""
+模型层单元测试
+
+本模块包含模型类业务方法的单元测试，覆盖缓存失效、构造参数与序列化等行为。
+
+Test Class:
+    TestUserModel: 用户模型测试类
+    TestUserRoleModel: 用户角色关联模型测试类
+    TestToDict: to_dict排除字段测试类
+
+Author: AI Assistant
+Created: 2025-07-19
+"""
+
+import pytest
+
+from dao.user_role_dao import UserRoleDao
+from models.user import User
+from models.user_role import UserRole
+
+
+class TestUserModel:
+    """用户模型测试类"""
+
+    # ==================== active_roles缓存失效测试 ====================
+
+    def test_active_roles_invalidated_on_revoke(self, db_session, sample_user, sample_user_role):
+        """测试通过DAO撤销角色后has_role不再返回缓存结果"""
+        # Given - 先读取一次，写入缓存
+        assert sample_user.has_role("test_role") is True
+
+        # When
+        UserRoleDao(db_session).revoke_role(sample_user.id, sample_user_role.role_id)
+
+        # Then
+        assert sample_user.has_role("test_role") is False
+
+    def test_active_roles_invalidated_on_user_role_deactivate(self, sample_user, sample_user_role):
+        """测试直接禁用关联后has_role不再返回缓存结果"""
+        # Given
+        assert sample_user.has_role("test_role") is True
+
+        # When
+        sample_user_role.deactivate()
+
+        # Then
+        assert sample_user.has_role("test_role") is False
+
+        # When - 重新启用
+        sample_user_role.activate()
+
+        # Then
+        assert sample_user.has_role("test_role") is True
+
+    def test_active_roles_invalidated_on_collection_change(self, sample_user, sample_role):
+        """测试user_roles集合增删后has_role随之变化"""
+        # Given
+        assert sample_user.has_role("test_role") is False
+        user_role = UserRole(role_id=sample_role.id, status=1)
+        user_role.role = sample_role
+
+        # When
+        sample_user.user_roles.append(user_role)
+
+        # Then
+        assert sample_user.has_role("test_role") is True
+
+        # When
+        sample_user.user_roles.remove(user_role)
+
+        # Then
+        assert sample_user.has_role("test_role") is False
+
+    def test_active_roles_invalidated_on_expire(self, db_session, sample_user, sample_role):
+        """测试通过DAO分配角色后，对象过期即可读到新角色"""
+        # Given
+        assert sample_user.has_role("test_role") is False
+        UserRoleDao(db_session).assign_role(sample_user.id, sample_role.id)
+
+        # When
+        db_session.expire(sample_user)
+
+        # Then
+        assert sample_user.has_role("test_role") is True
+
+
+class TestUserRoleModel:
+    """用户角色关联模型测试类"""
+
+    def test_init_accepts_relationship_kwargs(self, db_session, sample_user, sample_role):
+        """测试构造方法接受user/role/assigner关系参数"""
+        # Given
+        admin = User(username="admin", email="admin@example.com",
+                     password_hash="admin_hash", status=1)
+        db_session.add(admin)
+        db_session.flush()
+
+        # When
+        user_role = UserRole(user=sample_user, role=sample_role, assigner=admin)
+        db_session.add(user_role)
+        db_session.flush()
+
+        # Then
+        assert user_role.user is sample_user
+        assert user_role.role is sample_role
+        assert user_role.assigner is admin
+        assert user_role.user_id == sample_user.id
+        assert user_role.role_id == sample_role.id
+        assert user_role.assigned_by == admin.id
+
+    def test_hash_follows_current_key(self):
+        """测试修改主键后哈希值随之变化"""
+        # Given - 先计算一次哈希
+        user_role = UserRole(user_id=1, role_id=2)
+        assert hash(user_role) == hash(UserRole(user_id=1, role_id=2))
+
+        # When
+        user_role.role_id = 3
+
+        # Then
+        assert hash(user_role) == hash(UserRole(user_id=1, role_id=3))
+        assert UserRole(user_id=1, role_id=3) in {user_role}
+
+
+class TestToDict:
+    """to_dict排除字段测试类"""
+
+    def test_user_to_dict_keeps_exclude_list(self, sample_user):
+        """测试User.to_dict不修改调用方传入的排除列表"""
+        # Given
+        exclude_fields = ['email']
+
+        # When
+        result = sample_user.to_dict(exclude_fields=exclude_fields)
+
+        # Then
+        assert exclude_fields == ['email']
+        assert 'email' not in result
+        assert 'password_hash' not in result
+
+    def test_permission_to_dict_keeps_exclude_list(self, sample_permission):
+        """测试Permission.to_dict不修改调用方传入的排除列表"""
+        # Given
+        exclude_fields = ['description']
+
+        # When
+        result = sample_permission.to_dict(exclude_fields=exclude_fields)
+
+        # Then
+        assert exclude_fields == ['description']
+        assert 'description' not in result
+        assert 'updated_at' not in result
@@ -11,7 +11,7 @@
 import pymysql
 import pymysql.cursors
 from pymysql.connections import Connection
-from pymysql.cursors import Cursor
+from pymysql.cursors import Cursor, RE_INSERT_VALUES
 from contextlib import contextmanager
 from typing import Dict, List, Any, Optional, Union, Tuple
 import logging
@@ -78,7 +78,8 @@ class ConnectionPool:
     def __init__(self, config: DatabaseConfig, 
                  min_connections: int = 5,
                  max_connections: int = 20,
-                 max_idle_time: int = 3600):
+                 max_idle_time: int = 3600,
+                 ping_interval: int = 30):
         """
         初始化连接池
         
@@ -87,11 +88,13 @@ class ConnectionPool:
             min_connections: 最小连接数
             max_connections: 最大连接数
             max_idle_time: 最大空闲时间(秒)
+            ping_interval: 连接空闲超过该时长(秒)才在取出时ping检查
         """
         self.config = config
         self.min_connections = min_connections
         self.max_connections = max_connections
         self.max_idle_time = max_idle_time
+        self.ping_interval = ping_interval
         
         self._pool = Queue(maxsize=max_connections)
         self._active_connections = 0
@@ -147,8 +150,8 @@ class ConnectionPool:
                 # 尝试从池中获取连接
                 conn, last_used = self._pool.get_nowait()
                 
-                # 检查连接是否有效
-                if self._is_connection_valid(conn):
+                # 检查连接是否有效（刚归还的连接跳过ping，省去一次网络往返）
+                if time.time() - last_used < self.ping_interval or self._is_connection_valid(conn):
                     logger.debug("从连接池获取连接")
                     return conn
                 else:
@@ -186,17 +189,10 @@ class ConnectionPool:
             return
         
         try:
-            if self._is_connection_valid(conn):
-                # 重置连接状态
-                conn.rollback()
-                self._pool.put((conn, time.time()))
-                logger.debug("连接返回到连接池")
-            else:
-                # 连接无效，关闭并减少计数
-                conn.close()
-                with self._lock:
-                    self._active_connections -= 1
-                logger.debug("无效连接已关闭")
+            # 重置连接状态；连接已失效时rollback会抛出异常，由下方关闭连接
+            conn.rollback()
+            self._pool.put((conn, time.time()))
+            logger.debug("连接返回到连接池")
         except Exception as e:
             logger.error(f"返回连接到池失败：{str(e)}")
             conn.close()
@@ -335,6 +331,11 @@ class DatabaseManager:
         Returns:
             int: 影响的总行数
         """
+        # 只有匹配RE_INSERT_VALUES的INSERT语句才会被pymysql合并为一条多值INSERT，
+        # 否则executemany会逐行执行
+        if not RE_INSERT_VALUES.match(sql) and sql.lstrip()[:6].upper() == 'INSERT':
+            logger.warning("批量INSERT语句无法合并为多值INSERT，将逐行执行")
+        
         try:
             with self.get_connection() as conn:
                 with self.get_cursor(conn) as cursor: